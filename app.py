@@ -1,69 +1,33 @@
 import streamlit as st
 from datetime import date, timedelta
-import json
+import math
 import time
 import os
 
+import altair as alt
+import numpy as np
+import pandas as pd
+
+from bulk import completion_command, copy_command
+from commands import CommandError, CommandLog, EditCommand, ResetCommand, counter_change, day_change
+from history import SECONDS_PER_WEEK
+from render_stats import finish_interaction, rerun, section_averages, start_interaction
+from search import TaskIndex
+from sprints import Sprint, archive_sprint, load_active_sprint, load_archive_index, read_archive, save_active_sprint, summarize_sprint
+from storage import STORAGE_MODES, days_in_week, week_for_day
+from sync import DEFAULT_RATE_LIMIT_PER_SECOND, SYNC_CACHE_DIR, SYNC_CONFIG_FILE, SyncError, SyncJob, load_providers, update_command
+
 # --- Configuration ---
-SPRINT_START_DATE = date(2025, 5, 26) # May 26th, 2025 - Adjust this to your actual start date!
-TOTAL_SPRINT_DAYS = 60
+SPRINT_START_DATE = date(2025, 5, 26) # May 26th, 2025 - Start of the first sprint; later sprints are given their own start date
+TOTAL_SPRINT_DAYS = 60 # Length of the plan; each sprint records its own length in sprint.json
 JOB_APPLICATIONS_PER_WEEK_TARGET = 25
-TOTAL_SPRINT_WEEKS = TOTAL_SPRINT_DAYS / 7
-DATA_FILE = 'sprint_data.json'
-
-# --- Helper Functions for Data Persistence ---
-def load_data():
-    """Loads sprint data from a JSON file, ensuring all keys are present."""
-    # Define the default structure with all expected keys and their initial values
-    data = {
-        'tasks': {},
-        'notes': {},
-        'timer_data': {},
-        'jobs_applied_daily': {}, # Ensure this key is always initialized as a dictionary
-        'tryhackme_rooms_completed': 0,
-        'tryhackme_points_gained': 0
-    }
-    
-    if os.path.exists(DATA_FILE):
-        try:
-            with open(DATA_FILE, 'r') as f:
-                loaded_data = json.load(f)
-                # Update the default structure with any loaded data.
-                # This ensures existing data is kept, but missing keys are added with defaults.
-                data.update(loaded_data)
-                
-                # Explicitly ensure nested dictionaries are indeed dictionaries,
-                # in case a corrupted or malformed file changed their type.
-                if not isinstance(data.get('tasks'), dict):
-                    data['tasks'] = {}
-                if not isinstance(data.get('notes'), dict):
-                    data['notes'] = {}
-                if not isinstance(data.get('timer_data'), dict):
-                    data['timer_data'] = {}
-                if not isinstance(data.get('jobs_applied_daily'), dict):
-                    data['jobs_applied_daily'] = {}
-
-        except json.JSONDecodeError:
-            # Handle cases where the JSON file is corrupted or malformed
-            st.error("Error loading data file. It might be corrupted. Starting with fresh data.")
-            # Optionally, remove the corrupted file so it doesn't cause issues on next run
-            if os.path.exists(DATA_FILE):
-                os.remove(DATA_FILE)
-        except Exception as e:
-            # Catch any other unexpected errors during file loading
-            st.error(f"An unexpected error occurred while loading data: {e}. Starting with fresh data.")
-            if os.path.exists(DATA_FILE):
-                os.remove(DATA_FILE)
-    return data
-
-def save_data(data):
-    """Saves sprint data to a JSON file."""
-    with open(DATA_FILE, 'w') as f:
-        json.dump(data, f, indent=4)
-
-# --- Initialize Session State and Load Data ---
-if 'sprint_data' not in st.session_state:
-    st.session_state.sprint_data = load_data()
+DATA_FILE = os.environ.get('SPRINT_LEGACY_FILE', 'sprint_data.json') # Legacy single-file data, imported into DATA_DIR on first run
+FIRST_SPRINT_NAME = "Cybersecurity 60-Day Sprint"
+DATA_DIR = os.environ.get('SPRINT_DATA_DIR', 'sprint_data')
+EXPLORER_MAX_RESULTS = 100 # Task explorer shows at most this many matches at once
+STORAGE_MODE = os.environ.get('SPRINT_STORAGE_MODE', 'sharded') # 'sharded' (week shards) or 'single' (one JSON file)
+THM_CHART_MAX_POINTS = 500 # TryHackMe history charts are downsampled to at most this many points
+RESET_GRACE_SECONDS = 10 * 60 # How long a reset can be undone before the old data is purged
 
 # --- Daily Task Definitions (Highly Condensed for 1 hour/day & 25 jobs/week) ---
 daily_tasks_template = {
@@ -546,24 +510,172 @@ daily_tasks_template = {
     },
 }
 
-# --- Initialize or update sprint_data for new features ---
-# This loop now relies on the robust load_data() to ensure top-level keys exist.
-for day, day_info in daily_tasks_template.items():
-    day_str = str(day)
-    # Ensure nested structures for each day are initialized if they don't exist
-    st.session_state.sprint_data['tasks'].setdefault(day_str, [
-        {'desc': task['desc'], 'type': task['type'], 'completed': False}
-        for task in day_info['tasks']
-    ])
-    st.session_state.sprint_data['notes'].setdefault(day_str, "")
-    st.session_state.sprint_data['timer_data'].setdefault(day_str, {'start_time': None, 'elapsed_time': 0})
-    st.session_state.sprint_data['jobs_applied_daily'].setdefault(day_str, 0)
+# --- Initialize Session State and Load Data ---
+start_interaction() # Meter this interaction's payload and render time from here on
 
+# The active sprint owns the data in the store below; finished sprints live in the archive
+if 'active_sprint' not in st.session_state:
+    st.session_state.active_sprint = load_active_sprint(
+        DATA_DIR, Sprint(1, FIRST_SPRINT_NAME, SPRINT_START_DATE, TOTAL_SPRINT_DAYS)
+    )
+active_sprint = st.session_state.active_sprint
+sprint_start = active_sprint.start_date
+sprint_days = active_sprint.total_days
 
-# --- Streamlit App Layout ---
-st.set_page_config(layout="wide", page_title="Cybersecurity 60-Day Sprint Dashboard 🚀")
+# Only the manifest is read here; week shards are loaded lazily as days are viewed.
+if 'sprint_store' not in st.session_state:
+    st.session_state.sprint_store = STORAGE_MODES[STORAGE_MODE](DATA_DIR, daily_tasks_template, sprint_days, legacy_file=DATA_FILE)
+    st.session_state.sprint_store.purge_trash(RESET_GRACE_SECONDS)
+store = st.session_state.sprint_store
+
+# Every edit goes through the session's command log so it can be undone
+if 'command_log' not in st.session_state:
+    st.session_state.command_log = CommandLog()
+command_log = st.session_state.command_log
+
+# --- Calendar Navigation & Heatmap Helpers ---
+HEATMAP_METRICS = {
+    "Completion %": "completion",
+    "Focus Minutes": "focus_minutes",
+    "Jobs Applied": "jobs_applied",
+}
+WEEKDAY_NAMES = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+def day_date(day_num):
+    """Returns the calendar date of a sprint day."""
+    return sprint_start + timedelta(days=day_num - 1)
+
+def go_to_day(day_num):
+    """Selects a sprint day (clamped to the sprint) and keeps the calendar picker in sync."""
+    day_num = max(1, min(sprint_days, day_num))
+    st.session_state.selected_day = day_num
+    st.session_state.day_picker = day_date(day_num)
+
+def on_day_picked():
+    """Callback for the calendar picker."""
+    if st.session_state.day_picker is None:
+        go_to_day(st.session_state.selected_day)
+    else:
+        st.session_state.selected_day = (st.session_state.day_picker - sprint_start).days + 1
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def load_day_stats(data_dir, saved_weeks, _store):
+    """Per-day stat arrays, rebuilt only after a save.
+
+    Keyed on the content of the manifest's week summaries (saved_weeks), not its version
+    counter: every session counts versions in its own manifest copy, so two sessions can
+    reach the same version with different data.
+    """
+    return _store.day_stats()
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def build_heatmap_frame(data_dir, saved_weeks, start_date, _day_stats):
+    """Lays the per-day arrays out as a GitHub-style grid: one column per calendar week."""
+    completed = _day_stats['completed']
+    total = _day_stats['total']
+    offsets = np.arange(len(total)) + start_date.weekday()
+    return pd.DataFrame({
+        'day': np.arange(1, len(total) + 1),
+        'date': pd.Timestamp(start_date) + pd.to_timedelta(np.arange(len(total)), unit='D'),
+        'week': offsets // 7,
+        'weekday': np.array(WEEKDAY_NAMES)[offsets % 7],
+        'completion': np.round(np.divide(completed * 100, total, out=np.zeros(len(total)), where=total > 0), 1),
+        'focus_minutes': np.round(_day_stats['focus_minutes'], 1),
+        'jobs_applied': _day_stats['jobs_applied'],
+    })
 
-st.markdown("""
+def next_incomplete_day(day_stats, after_day):
+    """Returns the first day after after_day with unchecked tasks, wrapping around, or None."""
+    incomplete_days = np.flatnonzero(day_stats['completed'] < day_stats['total']) + 1
+    if incomplete_days.size == 0:
+        return None
+    later_days = incomplete_days[incomplete_days > after_day]
+    return int(later_days[0] if later_days.size else incomplete_days[0])
+
+# --- Command Helpers ---
+COUNTER_WIDGETS = {
+    'tryhackme_rooms_completed': "total_tryhackme_rooms_input",
+    'tryhackme_points_gained': "total_tryhackme_points_input"
+}
+
+def changed_widget_keys(change):
+    """Widget keys (exact, prefixes) showing the field a change touches."""
+    if change.kind == 'counter':
+        return {COUNTER_WIDGETS.get(change.target)}, ()
+    d = change.target
+    if change.path == ('tasks',): # Whole task list replaced, so every task position may have moved
+        return set(), (f"day_{d}_task_", f"explorer_task_{d}_")
+    if change.path[0] == 'tasks':
+        return {f"day_{d}_task_{change.path[1]}", f"explorer_task_{d}_{change.path[1]}"}, ()
+    return {{'notes': f"notes_day_{d}", 'jobs_applied_daily': f"jobs_applied_today_{d}"}.get(change.path[0])}, ()
+
+def clear_all_views():
+    """Drops the task index and every data-bound widget's state, after the whole dataset changed."""
+    st.session_state.pop('task_index', None)
+    prefixes = ("explorer_task_", "notes_day_", "jobs_applied_today_") + tuple(
+        f"day_{d}_task_" for d in range(1, sprint_days + 1)
+    )
+    for widget_key in [k for k in st.session_state if isinstance(k, str) and (k in COUNTER_WIDGETS.values() or k.startswith(prefixes))]:
+        del st.session_state[widget_key]
+
+def refresh_views(command, source_widget=None):
+    """Brings the task index and widget state in line with data a command just changed or restored.
+
+    source_widget is the widget the edit came from; it already shows the new value and is left alone.
+    """
+    if isinstance(command, ResetCommand):
+        clear_all_views()
+        return
+    exact_keys, prefixes = set(), ()
+    for c in command.changes:
+        change_keys, change_prefixes = changed_widget_keys(c)
+        exact_keys |= change_keys
+        prefixes += change_prefixes
+        if c.kind != 'day' or c.path[0] != 'tasks' or 'task_index' not in st.session_state:
+            continue
+        if c.path == ('tasks',):
+            st.session_state.pop('task_index') # Task positions changed
+        else:
+            completed = store.shard_for_day(c.target)['tasks'][str(c.target)][c.path[1]]['completed']
+            st.session_state.task_index.set_completed(c.target, c.path[1], completed)
+    exact_keys.discard(source_widget)
+    # Drop widget state so every input showing the changed data redraws from it
+    for widget_key in [k for k in st.session_state if isinstance(k, str) and k != source_widget and (k in exact_keys or k.startswith(prefixes))]:
+        del st.session_state[widget_key]
+
+def run_command(command, source_widget=None):
+    """Executes a command through the undo log and refreshes the views it touched."""
+    if command_log.execute(store, command) is not None:
+        refresh_views(command, source_widget)
+
+def task_check_command(day_num, task_idx, task, checked):
+    return EditCommand(
+        f"{'Check' if checked else 'Uncheck'} Day {day_num} task",
+        [day_change(day_num, ('tasks', task_idx, 'completed'), task['completed'], checked)]
+    )
+
+# --- Progress Sync Helpers ---
+@st.fragment(run_every=1)
+def show_sync_status():
+    """Polls the background sync job; once it finishes, applies its results and reruns the app."""
+    job = st.session_state.sync_job
+    if not job.done():
+        st.info(f"⏳ Syncing progress... ({time.time() - job.started_at:.0f}s)")
+        return
+    del st.session_state.sync_job
+    sync_command, sync_changes = update_command(store, job.update or {})
+    run_command(sync_command)
+    job.mark_applied()
+    st.session_state.sync_report = {
+        'changes': sync_changes,
+        'errors': job.errors,
+        'finished_at': time.time()
+    }
+    rerun()
+
+
+# --- Static Markup ---
+PAGE_STYLE = """
     <style>
     .big-font {
         font-size:30px !important;
@@ -588,310 +700,655 @@ st.markdown("""
         background-color: #45a049;
     }
     </style>
-    """, unsafe_allow_html=True)
+    """
+
+RESOURCES_MARKUP = f"""
+<p class='medium-font'><b>Your 60-Day Sprint is INTENSE!</b></p>
+<p>This schedule is incredibly ambitious. Achieving <b>{JOB_APPLICATIONS_PER_WEEK_TARGET} job applications per week</b> (averaging 3–4 per day) within a <b>1-hour daily limit</b>, while also making progress on certifications and hands-on labs, will demand <b>unwavering focus, discipline, and efficiency</b>.</p>
+
+<p><b>Key Strategies for Success:</b></p>
+<ul>
+    <li><b>Job Application Efficiency:</b> Have polished resume/cover letter templates ready. Use quick-apply features. Target roles requiring minimal customization initially. On high-target days, job search will be the primary focus.</li>
+    <li><b>Condensed Learning:</b>
+        <ul>
+            <li><b>Google Cert:</b> Prioritize videos and quizzes. Skim readings or rely on summaries if short on time.</li>
+            <li><b>Security+:</b> Focus on Professor Messer’s core domain videos. Save practice questions for review/post-sprint.</li>
+            <li><b>TryHackMe:</b> Choose short, high-impact rooms that directly reinforce cert concepts or show measurable skills.</li>
+        </ul>
+    </li>
+    <li><b>Consistency over Perfection:</b> If you miss a task or application target, don’t stress. Just adjust and keep going. Every step forward counts!</li>
+</ul>
+
+<p class='medium-font'><b>🔗 Essential Resource Links:</b></p>
+<ul>
+    <li><b>Google Cybersecurity Certificate (Coursera):</b> <a href="https://www.coursera.org/professional-certificates/google-cybersecurity" target="_blank">Link</a></li>
+    <li><b>Professor Messer (YouTube):</b> <a href="https://www.youtube.com/@professormesser" target="_blank">Search “Security+ SY0-601” or “SY0-701” playlists</a></li>
+    <li><b>TryHackMe:</b> <a href="https://tryhackme.com/" target="_blank">Link</a></li>
+    <li><b>Top Job Boards:</b> Indeed, LinkedIn Jobs, Glassdoor, CyberSN, Monster, ZipRecruiter</li>
+    <li><b>Networking:</b> LinkedIn is key. Also explore cybersecurity Discord groups like “The Many Hats Club.”</li>
+    <li><b>Deeper Cybersecurity Reading:</b> OWASP Top Ten, CVE Database, NIST Cybersecurity Framework.</li>
+</ul>
+
+<p class='medium-font'><b>🧠 Remember Self-Care:</b> This sprint is intense. Prioritize rest, healthy food, and breaks to stay sharp and avoid burnout.</p>
+"""
+
+# --- Streamlit App Layout ---
+st.set_page_config(layout="wide", page_title="Cybersecurity 60-Day Sprint Dashboard 🚀")
+
+st.markdown(PAGE_STYLE, unsafe_allow_html=True)
 
 st.title("🚀 Your Cybersecurity 60-Day Sprint Dashboard 🚀")
+st.caption(f"{active_sprint.name} · {sprint_start.strftime('%B %d, %Y')} – {active_sprint.end_date.strftime('%B %d, %Y')}")
+undo_bar = st.container() # Filled at the end of the run, once this run's edits are in the log
 st.markdown("---")
 
+# Surface any shard/manifest load problems once
+for load_error in store.errors:
+    st.error(load_error)
+store.errors.clear()
+
 # --- Calculate Current Day ---
 today = date.today()
-current_sprint_day = (today - SPRINT_START_DATE).days + 1
+current_sprint_day = (today - sprint_start).days + 1
 
 if current_sprint_day < 1:
-    st.info(f"✨ Your intensive sprint officially kicks off on **{SPRINT_START_DATE.strftime('%B %d, %Y')}**! Let's get ready! ✨")
+    st.info(f"✨ Your intensive sprint officially kicks off on **{sprint_start.strftime('%B %d, %Y')}**! Let's get ready! ✨")
     current_sprint_day = 1
-elif current_sprint_day > TOTAL_SPRINT_DAYS:
+elif current_sprint_day > sprint_days:
     st.balloons()
-    st.success(f"🎉 **CONGRATULATIONS! You've successfully completed your {TOTAL_SPRINT_DAYS}-day sprint!** 🎉")
+    st.success(f"🎉 **CONGRATULATIONS! You've successfully completed your {sprint_days}-day sprint!** 🎉")
     st.markdown("<p class='big-font' style='text-align: center; color: #4CAF50;'>You've crushed it! What an achievement! 💪</p>", unsafe_allow_html=True)
-    current_sprint_day = TOTAL_SPRINT_DAYS
+    current_sprint_day = sprint_days
 
 # --- Day Selection ---
+if 'selected_day' not in st.session_state:
+    go_to_day(current_sprint_day)
+
+day_stats = load_day_stats(DATA_DIR, store.manifest['weeks'], store)
+
 selected_day_col1, selected_day_col2 = st.columns([0.7, 0.3])
 with selected_day_col1:
-    selected_day_option = st.selectbox(
-        "### 🗓️ Select Your Sprint Day:",
-        options=[f"Day {d}" for d in range(1, TOTAL_SPRINT_DAYS + 1)],
-        index=min(current_sprint_day - 1, TOTAL_SPRINT_DAYS - 1),
-        key="day_selector"
+    st.date_input(
+        "🗓️ Jump to a Sprint Date:",
+        min_value=sprint_start,
+        max_value=day_date(sprint_days),
+        key="day_picker",
+        on_change=on_day_picked
     )
-selected_day_num = int(selected_day_option.split(" ")[1])
+    nav_col1, nav_col2, nav_col3, nav_col4 = st.columns(4)
+    with nav_col1:
+        st.button("◀️ Previous Day", key="prev_day_button", on_click=go_to_day, args=(st.session_state.selected_day - 1,),
+                  disabled=st.session_state.selected_day <= 1)
+    with nav_col2:
+        st.button("Next Day ▶️", key="next_day_button", on_click=go_to_day, args=(st.session_state.selected_day + 1,),
+                  disabled=st.session_state.selected_day >= sprint_days)
+    with nav_col3:
+        st.button("📍 Today", key="today_button", on_click=go_to_day, args=(current_sprint_day,))
+    with nav_col4:
+        incomplete_day = next_incomplete_day(day_stats, st.session_state.selected_day)
+        st.button("⏭️ Next Incomplete Day", key="next_incomplete_button", on_click=go_to_day, args=(incomplete_day or 1,),
+                  disabled=incomplete_day is None)
+
+selected_day_num = st.session_state.selected_day
 selected_day_str = str(selected_day_num)
+selected_day_label = f"Day {selected_day_num}"
+selected_shard = store.shard_for_day(selected_day_num) # Only this week's shard is loaded
 
 with selected_day_col2:
-    st.markdown(f"<p class='big-font' style='text-align: center; margin-top: 20px;'>Day {selected_day_num} of {TOTAL_SPRINT_DAYS}</p>", unsafe_allow_html=True)
-    st.markdown(f"<p style='text-align: center; font-size: 18px;'>{daily_tasks_template[selected_day_num]['date'].strftime('%B %d, %Y')}</p>", unsafe_allow_html=True)
+    st.markdown(f"<p class='big-font' style='text-align: center; margin-top: 20px;'>Day {selected_day_num} of {sprint_days}</p>", unsafe_allow_html=True)
+    st.markdown(f"<p style='text-align: center; font-size: 18px;'>{day_date(selected_day_num).strftime('%B %d, %Y')}</p>", unsafe_allow_html=True)
 
-st.markdown("---")
+# --- Sections ---
+# Each tab is drawn by its own function, and only the open tab's function runs, so an
+# interaction only computes and sends the section the user is looking at.
+def today_section():
+    # --- Daily Task Management ---
+    st.header("📝 Daily Tasks & Check-offs:")
+    st.markdown(f"<p class='medium-font'>Here are your focus tasks for <b>{selected_day_label}</b>. Check them off as you complete them!</p>", unsafe_allow_html=True)
+        
+    # Display tasks for the selected day
+    for i, task in enumerate(selected_shard['tasks'][selected_day_str]):
+        checkbox_key = f"day_{selected_day_str}_task_{i}"
+    
+        task_col1, task_col2 = st.columns([0.15, 0.85]) # Adjust column width for type and description
+        with task_col1:
+            st.markdown(f"<span style='font-weight: bold; color: #4B0082;'>{task['type']}</span>", unsafe_allow_html=True)
+        with task_col2:
+            checked = st.checkbox(
+                task['desc'], 
+                value=task['completed'], 
+                key=checkbox_key
+            )
+            if checked != task['completed']:
+                run_command(task_check_command(selected_day_num, i, task, checked), checkbox_key)
+                rerun()
 
-# --- Overall Sprint Progress ---
-total_tasks_count = sum(len(daily_tasks_template[day]['tasks']) for day in range(1, TOTAL_SPRINT_DAYS + 1))
-completed_tasks_count = 0
-for day_str_key in st.session_state.sprint_data['tasks']:
-    for task_obj in st.session_state.sprint_data['tasks'][day_str_key]:
-        if task_obj['completed']:
-            completed_tasks_count += 1
-
-overall_progress_percentage = (completed_tasks_count / total_tasks_count) * 100 if total_tasks_count > 0 else 0
-st.markdown(f"### 📈 Overall Sprint Progress: {overall_progress_percentage:.1f}%")
-st.progress(overall_progress_percentage / 100, text=f"**You're making great strides!**")
-
-if overall_progress_percentage < 25:
-    st.info("Keep that momentum going! Every single task moves you closer to your goal. 💪")
-elif 25 <= overall_progress_percentage < 50:
-    st.warning("Halfway to the finish line! You're building an incredible foundation. Stay consistent! ⚡")
-elif 50 <= overall_progress_percentage < 75:
-    st.success("Over the peak! The end is in sight. Push through these crucial days! 🚀")
-else:
-    st.success("Final stretch! You're a cybersecurity force of nature. Finish strong! ✨")
+    # --- Bulk Actions ---
+    # Each action is one in-memory batch, one save pass over the touched weeks and one rerun.
+    with st.expander("⚡ Bulk Actions", expanded=False):
+        st.markdown("**Mark tasks complete or incomplete in one go:**")
+        bulk_col1, bulk_col2 = st.columns(2)
+        with bulk_col1:
+            bulk_scope = st.radio("Scope:", ["This Day", "This Week", "Whole Sprint"], horizontal=True, key="bulk_scope")
+        with bulk_col2:
+            pillar_types = sorted({t['type'] for day_info in daily_tasks_template.values() for t in day_info['tasks']})
+            bulk_pillar = st.selectbox("Pillar:", ["All Pillars"] + pillar_types, key="bulk_pillar")
 
-st.markdown("---")
+        if bulk_scope == "This Day":
+            bulk_days = [selected_day_num]
+        elif bulk_scope == "This Week":
+            bulk_days = list(days_in_week(week_for_day(selected_day_num), sprint_days))
+        else:
+            bulk_days = list(range(1, sprint_days + 1))
 
-# --- Categorized Progress Bars ---
-st.subheader("📊 Progress by Pillar:")
-
-# Calculate progress for each category
-category_progress = {
-    "Google Cert": {"completed": 0, "total": 0},
-    "Security+": {"completed": 0, "total": 0},
-    "TryHackMe": {"completed": 0, "total": 0},
-    "Job Search Task": {"completed": 0, "total": 0}, # For Job Search tasks within daily plan
-    "Other Learning": {"completed": 0, "total": 0},
-    "Review": {"completed": 0, "total": 0},
-    "Future Planning": {"completed": 0, "total": 0},
-    "Motivation": {"completed": 0, "total": 0},
-}
+        bulk_button_col1, bulk_button_col2 = st.columns(2)
+        bulk_completed = None
+        with bulk_button_col1:
+            if st.button("✅ Mark Complete", key="bulk_complete_button"):
+                bulk_completed = True
+        with bulk_button_col2:
+            if st.button("↩️ Mark Incomplete", key="bulk_incomplete_button"):
+                bulk_completed = False
+        if bulk_completed is not None:
+            bulk_command = completion_command(
+                store, bulk_days, bulk_completed, None if bulk_pillar == "All Pillars" else bulk_pillar
+            )
+            run_command(bulk_command)
+            st.toast(f"Updated {len(bulk_command.changes)} task(s)!")
+            rerun()
+
+        st.markdown(f"**Copy or shift tasks from {selected_day_label} to another day:**")
+        selected_day_tasks = selected_shard['tasks'][selected_day_str]
+        bulk_positions = st.multiselect(
+            "Tasks:",
+            options=list(range(len(selected_day_tasks))),
+            format_func=lambda position: selected_day_tasks[position]['desc'],
+            key=f"bulk_tasks_{selected_day_str}"
+        )
+        bulk_copy_col1, bulk_copy_col2 = st.columns(2)
+        with bulk_copy_col1:
+            bulk_target_day = st.number_input(
+                "Target Day:", min_value=1, max_value=sprint_days,
+                value=min(selected_day_num + 1, sprint_days), step=1, key=f"bulk_target_day_{selected_day_str}"
+            )
+        with bulk_copy_col2:
+            bulk_mode = st.radio("Mode:", ["Copy", "Shift"], horizontal=True, key="bulk_copy_mode")
+        if st.button("📋 Apply to Target Day", key="bulk_copy_button", disabled=not bulk_positions or bulk_target_day == selected_day_num):
+            run_command(copy_command(store, selected_day_num, bulk_target_day, bulk_positions, move=bulk_mode == "Shift"))
+            st.session_state.pop(f"bulk_tasks_{selected_day_str}", None) # Task positions changed
+            st.toast(f"{'Shifted' if bulk_mode == 'Shift' else 'Copied'} {len(bulk_positions)} task(s) to Day {bulk_target_day}!")
+            rerun()
 
-for day_str_key in st.session_state.sprint_data['tasks']:
-    for task_obj in st.session_state.sprint_data['tasks'][day_str_key]:
-        task_type = task_obj['type']
-        if task_type in category_progress:
-            category_progress[task_type]["total"] += 1
-            if task_obj['completed']:
-                category_progress[task_type]["completed"] += 1
+    st.markdown("---")
 
-# Display categorized progress
-progress_cols = st.columns(4)
+    # --- Task Explorer ---
+    st.header("🔎 Task Explorer:")
+    if st.toggle("Search and filter tasks across the whole sprint", key="task_explorer_toggle"):
+        # Indexes are built once per session and then updated in place on every check-off
+        if 'task_index' not in st.session_state:
+            st.session_state.task_index = TaskIndex.build(store)
+        task_index = st.session_state.task_index
 
-categories_to_display = ["Google Cert", "Security+", "TryHackMe"] # Focus on core three
+        explorer_col1, explorer_col2, explorer_col3, explorer_col4 = st.columns([0.3, 0.2, 0.2, 0.3])
+        with explorer_col1:
+            explorer_types = st.multiselect("Pillar:", sorted(task_index.by_type), key="explorer_types")
+        with explorer_col2:
+            explorer_status = st.selectbox("Status:", ["All", "Pending", "Completed"], key="explorer_status")
+        with explorer_col3:
+            explorer_weeks = st.multiselect("Week:", sorted(task_index.by_week), key="explorer_weeks")
+        with explorer_col4:
+            explorer_keywords = st.text_input("Keywords:", placeholder="e.g. splunk", key="explorer_keywords")
 
-for i, category in enumerate(categories_to_display):
-    with progress_cols[i % 4]:
-        completed = category_progress[category]["completed"]
-        total = category_progress[category]["total"]
-        percent = (completed / total) * 100 if total > 0 else 0
-        st.markdown(f"**{category}:** {percent:.1f}%")
-        st.progress(percent / 100)
+        query_started = time.perf_counter()
+        explorer_results = task_index.query(
+            types=explorer_types,
+            status=None if explorer_status == "All" else explorer_status.lower(),
+            weeks=explorer_weeks,
+            keywords=explorer_keywords
+        )
+        query_ms = (time.perf_counter() - query_started) * 1000
+        st.caption(f"{len(explorer_results)} matching task(s) in {query_ms:.2f} ms"
+                   + (f" — showing the first {EXPLORER_MAX_RESULTS}" if len(explorer_results) > EXPLORER_MAX_RESULTS else ""))
 
-# Job Applications specific progress
-total_jobs_applied_overall = sum(st.session_state.sprint_data['jobs_applied_daily'].values())
-job_application_target_overall = JOB_APPLICATIONS_PER_WEEK_TARGET * TOTAL_SPRINT_WEEKS
-job_app_percent = (total_jobs_applied_overall / job_application_target_overall) * 100 if job_application_target_overall > 0 else 0
+        for result_day, result_idx, result_task in explorer_results[:EXPLORER_MAX_RESULTS]:
+            result_col1, result_col2, result_col3 = st.columns([0.1, 0.15, 0.75])
+            with result_col1:
+                st.markdown(f"**Day {result_day}**")
+            with result_col2:
+                st.markdown(f"<span style='font-weight: bold; color: #4B0082;'>{result_task['type']}</span>", unsafe_allow_html=True)
+            with result_col3:
+                result_checked = st.checkbox(
+                    result_task['desc'],
+                    value=result_task['completed'],
+                    key=f"explorer_task_{result_day}_{result_idx}"
+                )
+                if result_checked != result_task['completed']:
+                    run_command(
+                        task_check_command(result_day, result_idx, result_task, result_checked),
+                        f"explorer_task_{result_day}_{result_idx}"
+                    )
+                    rerun()
 
-with progress_cols[len(categories_to_display) % 4]: # Place in next available column
-    st.markdown(f"**Job Applications:** {job_app_percent:.1f}%")
-    st.progress(job_app_percent / 100)
+def progress_section():
+    with st.expander("🟪 Activity Heatmap", expanded=False):
+        heatmap_metric_label = st.radio("Color by:", list(HEATMAP_METRICS), horizontal=True, key="heatmap_metric")
+        heatmap_metric = HEATMAP_METRICS[heatmap_metric_label]
+        heatmap_frame = build_heatmap_frame(DATA_DIR, store.manifest['weeks'], sprint_start, day_stats)
+        heatmap_chart = alt.Chart(heatmap_frame).mark_rect(cornerRadius=2, stroke='white').encode(
+            x=alt.X('week:O', axis=None),
+            y=alt.Y('weekday:O', sort=WEEKDAY_NAMES, title=None),
+            color=alt.Color(f'{heatmap_metric}:Q', scale=alt.Scale(scheme='purples'), title=heatmap_metric_label),
+            tooltip=[
+                alt.Tooltip('day:Q', title='Day'),
+                alt.Tooltip('date:T', title='Date', format='%b %d, %Y'),
+                alt.Tooltip('completion:Q', title='Completion %'),
+                alt.Tooltip('focus_minutes:Q', title='Focus Minutes'),
+                alt.Tooltip('jobs_applied:Q', title='Jobs Applied'),
+            ]
+        ).properties(height=160)
+        st.altair_chart(heatmap_chart, width="stretch")
 
-st.markdown("---")
+    st.markdown("---")
 
-# --- Daily Task Management ---
-st.header("📝 Daily Tasks & Check-offs:")
-st.markdown(f"<p class='medium-font'>Here are your focus tasks for <b>{selected_day_option}</b>. Check them off as you complete them!</p>", unsafe_allow_html=True)
-        
-# Display tasks for the selected day
-for i, task in enumerate(st.session_state.sprint_data['tasks'][selected_day_str]):
-    checkbox_key = f"day_{selected_day_str}_task_{i}"
-    
-    task_col1, task_col2 = st.columns([0.15, 0.85]) # Adjust column width for type and description
-    with task_col1:
-        st.markdown(f"<span style='font-weight: bold; color: #4B0082;'>{task['type']}</span>", unsafe_allow_html=True)
-    with task_col2:
-        checked = st.checkbox(
-            task['desc'], 
-            value=task['completed'], 
-            key=checkbox_key
-        )
-        if checked != task['completed']:
-            st.session_state.sprint_data['tasks'][selected_day_str][i]['completed'] = checked
-            save_data(st.session_state.sprint_data)
-            st.rerun()
+    # --- Overall Sprint Progress ---
+    # Aggregates come from the per-week summaries in the manifest, so no other shards are loaded.
+    week_summaries = store.week_summaries()
+    total_tasks_count = sum(sum(summary['total'].values()) for summary in week_summaries)
+    completed_tasks_count = sum(sum(summary['completed'].values()) for summary in week_summaries)
 
-st.markdown("---")
+    overall_progress_percentage = (completed_tasks_count / total_tasks_count) * 100 if total_tasks_count > 0 else 0
+    st.markdown(f"### 📈 Overall Sprint Progress: {overall_progress_percentage:.1f}%")
+    st.progress(overall_progress_percentage / 100, text=f"**You're making great strides!**")
 
-# --- Job Application Tracker ---
-st.header("💼 Job Application Tracker:")
-
-# Input for jobs applied today
-current_jobs_applied_today = st.session_state.sprint_data['jobs_applied_daily'].get(selected_day_str, 0)
-new_jobs_applied_today = st.number_input(
-    f"🚀 Jobs Applied Today ({selected_day_option}):",
-    min_value=0,
-    value=current_jobs_applied_today,
-    step=1,
-    key=f"jobs_applied_today_{selected_day_str}"
-)
-if new_jobs_applied_today != current_jobs_applied_today:
-    st.session_state.sprint_data['jobs_applied_daily'][selected_day_str] = new_jobs_applied_today
-    save_data(st.session_state.sprint_data)
-    st.toast("Daily job applications updated!")
-
-# Calculate jobs applied this week
-current_week_num = (selected_day_num - 1) // 7
-jobs_this_week = 0
-for d in range(current_week_num * 7 + 1, min((current_week_num + 1) * 7 + 1, TOTAL_SPRINT_DAYS + 1)):
-    jobs_this_week += st.session_state.sprint_data['jobs_applied_daily'].get(str(d), 0)
-
-# Display weekly and overall totals
-job_tracker_col1, job_tracker_col2 = st.columns(2)
-with job_tracker_col1:
-    st.markdown(f"<p class='medium-font'>🎯 <b>Jobs Applied This Week:</b> <span style='font-size: 24px; font-weight: bold; color: #8A2BE2;'>{jobs_this_week}</span> / {JOB_APPLICATIONS_PER_WEEK_TARGET}</p>", unsafe_allow_html=True)
-    if jobs_this_week >= JOB_APPLICATIONS_PER_WEEK_TARGET:
-        st.success("🎉 You've hit your weekly job application goal! Fantastic!")
+    if overall_progress_percentage < 25:
+        st.info("Keep that momentum going! Every single task moves you closer to your goal. 💪")
+    elif 25 <= overall_progress_percentage < 50:
+        st.warning("Halfway to the finish line! You're building an incredible foundation. Stay consistent! ⚡")
+    elif 50 <= overall_progress_percentage < 75:
+        st.success("Over the peak! The end is in sight. Push through these crucial days! 🚀")
     else:
-        st.info(f"Keep pushing! You need {JOB_APPLICATIONS_PER_WEEK_TARGET - jobs_this_week} more applications this week.")
-with job_tracker_col2:
-    st.markdown(f"<p class='medium-font'>🌐 <b>Total Jobs Applied Overall:</b> <span style='font-size: 24px; font-weight: bold; color: #8A2BE2;'>{total_jobs_applied_overall}</span></p>", unsafe_allow_html=True)
-    st.caption(f"Aiming for ~{JOB_APPLICATIONS_PER_WEEK_TARGET * TOTAL_SPRINT_WEEKS} by end of sprint.")
+        st.success("Final stretch! You're a cybersecurity force of nature. Finish strong! ✨")
 
-st.markdown("---")
+    st.markdown("---")
 
-# --- Timer for Focused Work Sessions ---
-st.header("⏰ Focus Timer:")
-st.markdown("<p class='medium-font'>Use this to track your dedicated study time for <b>{selected_day_option}</b>.</p>", unsafe_allow_html=True)
+    # --- Categorized Progress Bars ---
+    st.subheader("📊 Progress by Pillar:")
 
-timer_data = st.session_state.sprint_data['timer_data'][selected_day_str]
-        
-timer_col1, timer_col2, timer_col3 = st.columns([0.3, 0.3, 0.4])
-        
-with timer_col1:
-    if st.button("▶️ Start Timer", key=f"start_timer_{selected_day_str}"):
-        timer_data['start_time'] = time.time()
-        save_data(st.session_state.sprint_data)
-        st.toast("Timer started! Focus up! ⚡")
-        
-with timer_col2:
-    if st.button("⏹️ Stop Timer", key=f"stop_timer_{selected_day_str}"):
-        if timer_data['start_time'] is not None:
-            elapsed = time.time() - timer_data['start_time']
-            timer_data['elapsed_time'] += elapsed
-            timer_data['start_time'] = None # Reset start time
-            save_data(st.session_state.sprint_data)
-            st.toast(f"Timer stopped! Added {elapsed:.0f} seconds to your session.")
-        else:
-            st.warning("Timer not active. Press 'Start Timer' first.")
+    # Calculate progress for each category
+    category_progress = {
+        "Google Cert": {"completed": 0, "total": 0},
+        "Security+": {"completed": 0, "total": 0},
+        "TryHackMe": {"completed": 0, "total": 0},
+        "Job Search Task": {"completed": 0, "total": 0}, # For Job Search tasks within daily plan
+        "Other Learning": {"completed": 0, "total": 0},
+        "Review": {"completed": 0, "total": 0},
+        "Future Planning": {"completed": 0, "total": 0},
+        "Motivation": {"completed": 0, "total": 0},
+    }
 
-with timer_col3:
-    total_seconds = timer_data['elapsed_time']
-    hours = int(total_seconds // 3600)
-    minutes = int((total_seconds % 3600) // 60)
-    seconds = int(total_seconds % 60)
-    st.markdown(f"<p class='medium-font'>Total Focus Time: <b>{hours:02d}h {minutes:02d}m {seconds:02d}s</b></p>", unsafe_allow_html=True)
+    for summary in week_summaries:
+        for task_type, total in summary['total'].items():
+            if task_type in category_progress:
+                category_progress[task_type]["total"] += total
+                category_progress[task_type]["completed"] += summary['completed'].get(task_type, 0)
 
-st.markdown("---")
+    # Display categorized progress
+    progress_cols = st.columns(4)
 
-# --- Daily Notes & Reflections ---
-st.header("✍️ Daily Notes & Reflections:")
-st.markdown("<p class='medium-font'>Jot down your key learnings, challenges, or thoughts for <b>{selected_day_option}</b>.</p>", unsafe_allow_html=True)
-        
-current_notes = st.session_state.sprint_data['notes'][selected_day_str]
-new_notes = st.text_area(
-    "What did you learn today? What challenges did you face?",
-    value=current_notes,
-    height=200,
-    key=f"notes_day_{selected_day_str}"
-)
-if new_notes != current_notes:
-    st.session_state.sprint_data['notes'][selected_day_str] = new_notes
-    save_data(st.session_state.sprint_data)
-    st.toast("Notes saved successfully! 📝")
+    categories_to_display = ["Google Cert", "Security+", "TryHackMe"] # Focus on core three
 
-st.markdown("---")
+    for i, category in enumerate(categories_to_display):
+        with progress_cols[i % 4]:
+            completed = category_progress[category]["completed"]
+            total = category_progress[category]["total"]
+            percent = (completed / total) * 100 if total > 0 else 0
+            st.markdown(f"**{category}:** {percent:.1f}%")
+            st.progress(percent / 100)
+
+    # Job Applications specific progress
+    total_jobs_applied_overall = sum(summary['jobs_applied'] for summary in week_summaries)
+    job_application_target_overall = JOB_APPLICATIONS_PER_WEEK_TARGET * sprint_days / 7
+    job_app_percent = (total_jobs_applied_overall / job_application_target_overall) * 100 if job_application_target_overall > 0 else 0
+
+    with progress_cols[len(categories_to_display) % 4]: # Place in next available column
+        st.markdown(f"**Job Applications:** {job_app_percent:.1f}%")
+        st.progress(job_app_percent / 100)
+
+    st.markdown("---")
+
+    # --- External Progress Sync ---
+    st.header("🔄 Progress Sync:")
+    try:
+        sync_providers, sync_rate_limit = load_providers()
+    except (SyncError, ValueError, TypeError) as e:
+        sync_providers, sync_rate_limit = [], DEFAULT_RATE_LIMIT_PER_SECOND
+        st.error(f"Could not load {SYNC_CONFIG_FILE}: {e}")
+
+    if not sync_providers:
+        st.info(f"No sync sources configured. Add providers to `{SYNC_CONFIG_FILE}` to pull TryHackMe totals, course progress or job applications automatically.")
+    else:
+        st.markdown(f"<p class='medium-font'>Sources: <b>{', '.join(provider.name for provider in sync_providers)}</b></p>", unsafe_allow_html=True)
+        if st.button("🔄 Sync Now", key="sync_now_button", disabled='sync_job' in st.session_state):
+            st.session_state.sync_job = SyncJob(
+                sync_providers, os.path.join(DATA_DIR, SYNC_CACHE_DIR), sync_rate_limit, sprint_days
+            )
+        if 'sync_job' in st.session_state:
+            show_sync_status()
+
+    sync_report = st.session_state.get('sync_report')
+    if sync_report:
+        for provider_name, error in sync_report['errors'].items():
+            st.warning(f"{provider_name}: {error}")
+        finished_at = time.strftime('%H:%M:%S', time.localtime(sync_report['finished_at']))
+        if sync_report['changes']:
+            with st.expander(f"✅ Last sync at {finished_at}: {len(sync_report['changes'])} change(s)"):
+                for change in sync_report['changes']:
+                    st.markdown(f"- {change}")
+        else:
+            st.caption(f"Last sync at {finished_at}: everything was already up to date.")
 
-# --- TryHackMe Quantifiable Progress ---
-st.header("🎮 TryHackMe Progress:")
-st.markdown("<p class='medium-font'>Keep track of your hands-on achievements on TryHackMe!</p>", unsafe_allow_html=True)
+    st.markdown("---")
 
-thm_col1, thm_col2 = st.columns(2)
+    # --- Data Reset Button ---
+    st.header("reset All Data:")
+    st.warning(f" This will delete ALL your tracked progress (tasks, notes, timer, job apps, TryHackMe data). You can undo it for {RESET_GRACE_SECONDS // 60} minutes, after which it is gone for good!")
+    if st.button("Delete All Data", key="reset_all_data_button"):
+        run_command(ResetCommand(RESET_GRACE_SECONDS))
+        st.toast("All sprint data has been reset! Starting fresh...")
+        rerun() # Rerun to reflect the cleared data
 
-with thm_col1:
-    current_rooms = st.session_state.sprint_data['tryhackme_rooms_completed']
-    new_rooms = st.number_input(
-        "Total TryHackMe Rooms Completed:",
+def jobs_section():
+    # --- Job Application Tracker ---
+    st.header("💼 Job Application Tracker:")
+
+    # Input for jobs applied today
+    current_jobs_applied_today = selected_shard['jobs_applied_daily'].get(selected_day_str, 0)
+    new_jobs_applied_today = st.number_input(
+        f"🚀 Jobs Applied Today ({selected_day_label}):",
         min_value=0,
-        value=current_rooms,
+        value=current_jobs_applied_today,
         step=1,
-        key="total_tryhackme_rooms_input"
+        key=f"jobs_applied_today_{selected_day_str}"
     )
-    if new_rooms != current_rooms:
-        st.session_state.sprint_data['tryhackme_rooms_completed'] = new_rooms
-        save_data(st.session_state.sprint_data)
-        st.toast("TryHackMe rooms updated!")
-
-with thm_col2:
-    current_points = st.session_state.sprint_data['tryhackme_points_gained']
-    new_points = st.number_input(
-        "Total TryHackMe Points Gained:",
-        min_value=0,
-        value=current_points,
-        step=10,
-        key="total_tryhackme_points_input"
+    if new_jobs_applied_today != current_jobs_applied_today:
+        run_command(EditCommand(
+            f"Set Day {selected_day_num} jobs applied",
+            [day_change(selected_day_num, ('jobs_applied_daily',), current_jobs_applied_today, new_jobs_applied_today)]
+        ), f"jobs_applied_today_{selected_day_str}")
+        st.toast("Daily job applications updated!")
+
+    total_jobs_applied_overall = sum(summary['jobs_applied'] for summary in store.week_summaries())
+
+    # Calculate jobs applied this week (the selected shard holds exactly this week's days)
+    jobs_this_week = sum(selected_shard['jobs_applied_daily'].values())
+
+    # Display weekly and overall totals
+    job_tracker_col1, job_tracker_col2 = st.columns(2)
+    with job_tracker_col1:
+        st.markdown(f"<p class='medium-font'>🎯 <b>Jobs Applied This Week:</b> <span style='font-size: 24px; font-weight: bold; color: #8A2BE2;'>{jobs_this_week}</span> / {JOB_APPLICATIONS_PER_WEEK_TARGET}</p>", unsafe_allow_html=True)
+        if jobs_this_week >= JOB_APPLICATIONS_PER_WEEK_TARGET:
+            st.success("🎉 You've hit your weekly job application goal! Fantastic!")
+        else:
+            st.info(f"Keep pushing! You need {JOB_APPLICATIONS_PER_WEEK_TARGET - jobs_this_week} more applications this week.")
+    with job_tracker_col2:
+        st.markdown(f"<p class='medium-font'>🌐 <b>Total Jobs Applied Overall:</b> <span style='font-size: 24px; font-weight: bold; color: #8A2BE2;'>{total_jobs_applied_overall}</span></p>", unsafe_allow_html=True)
+        st.caption(f"Aiming for ~{JOB_APPLICATIONS_PER_WEEK_TARGET * sprint_days / 7} by end of sprint.")
+
+def timer_section():
+    # --- Timer for Focused Work Sessions ---
+    st.header("⏰ Focus Timer:")
+    st.markdown(f"<p class='medium-font'>Use this to track your dedicated study time for <b>{selected_day_label}</b>.</p>", unsafe_allow_html=True)
+
+    timer_data = selected_shard['timer_data'][selected_day_str]
+        
+    timer_col1, timer_col2, timer_col3 = st.columns([0.3, 0.3, 0.4])
+        
+    with timer_col1:
+        if st.button("▶️ Start Timer", key=f"start_timer_{selected_day_str}"):
+            run_command(EditCommand(
+                f"Start Day {selected_day_num} timer",
+                [day_change(selected_day_num, ('timer_data',), timer_data, dict(timer_data, start_time=time.time()))]
+            ))
+            st.toast("Timer started! Focus up! ⚡")
+        
+    with timer_col2:
+        if st.button("⏹️ Stop Timer", key=f"stop_timer_{selected_day_str}"):
+            if timer_data['start_time'] is not None:
+                elapsed = time.time() - timer_data['start_time']
+                stopped_timer = {'start_time': None, 'elapsed_time': timer_data['elapsed_time'] + elapsed} # Reset start time
+                run_command(EditCommand(
+                    f"Stop Day {selected_day_num} timer",
+                    [day_change(selected_day_num, ('timer_data',), timer_data, stopped_timer)]
+                ))
+                st.toast(f"Timer stopped! Added {elapsed:.0f} seconds to your session.")
+            else:
+                st.warning("Timer not active. Press 'Start Timer' first.")
+
+    with timer_col3:
+        total_seconds = selected_shard['timer_data'][selected_day_str]['elapsed_time']
+        hours = int(total_seconds // 3600)
+        minutes = int((total_seconds % 3600) // 60)
+        seconds = int(total_seconds % 60)
+        st.markdown(f"<p class='medium-font'>Total Focus Time: <b>{hours:02d}h {minutes:02d}m {seconds:02d}s</b></p>", unsafe_allow_html=True)
+
+def notes_section():
+    # --- Daily Notes & Reflections ---
+    st.header("✍️ Daily Notes & Reflections:")
+    st.markdown(f"<p class='medium-font'>Jot down your key learnings, challenges, or thoughts for <b>{selected_day_label}</b>.</p>", unsafe_allow_html=True)
+        
+    current_notes = selected_shard['notes'][selected_day_str]
+    new_notes = st.text_area(
+        "What did you learn today? What challenges did you face?",
+        value=current_notes,
+        height=200,
+        key=f"notes_day_{selected_day_str}"
     )
-    if new_points != current_points:
-        st.session_state.sprint_data['tryhackme_points_gained'] = new_points
-        save_data(st.session_state.sprint_data)
-        st.toast("TryHackMe points updated!")
+    if new_notes != current_notes:
+        run_command(EditCommand(
+            f"Edit Day {selected_day_num} notes",
+            [day_change(selected_day_num, ('notes',), current_notes, new_notes)]
+        ), f"notes_day_{selected_day_str}")
+        st.toast("Notes saved successfully! 📝")
 
-st.markdown("---")
+def tryhackme_section():
+    # --- TryHackMe Quantifiable Progress ---
+    st.header("🎮 TryHackMe Progress:")
+    st.markdown("<p class='medium-font'>Keep track of your hands-on achievements on TryHackMe!</p>", unsafe_allow_html=True)
 
-st.header("💡 Important Notes & Key Resources:")
-st.markdown(f"""
-<p class='medium-font'><b>Your 60-Day Sprint is INTENSE!</b></p>
-<p>This schedule is incredibly ambitious. Achieving <b>{JOB_APPLICATIONS_PER_WEEK_TARGET} job applications per week</b> (averaging 3–4 per day) within a <b>1-hour daily limit</b>, while also making progress on certifications and hands-on labs, will demand <b>unwavering focus, discipline, and efficiency</b>.</p>
+    thm_col1, thm_col2 = st.columns(2)
 
-<p><b>Key Strategies for Success:</b></p>
-<ul>
-    <li><b>Job Application Efficiency:</b> Have polished resume/cover letter templates ready. Use quick-apply features. Target roles requiring minimal customization initially. On high-target days, job search will be the primary focus.</li>
-    <li><b>Condensed Learning:</b>
-        <ul>
-            <li><b>Google Cert:</b> Prioritize videos and quizzes. Skim readings or rely on summaries if short on time.</li>
-            <li><b>Security+:</b> Focus on Professor Messer’s core domain videos. Save practice questions for review/post-sprint.</li>
-            <li><b>TryHackMe:</b> Choose short, high-impact rooms that directly reinforce cert concepts or show measurable skills.</li>
-        </ul>
-    </li>
-    <li><b>Consistency over Perfection:</b> If you miss a task or application target, don’t stress. Just adjust and keep going. Every step forward counts!</li>
-</ul>
+    with thm_col1:
+        current_rooms = store.manifest['tryhackme_rooms_completed']
+        new_rooms = st.number_input(
+            "Total TryHackMe Rooms Completed:",
+            min_value=0,
+            value=current_rooms,
+            step=1,
+            key="total_tryhackme_rooms_input"
+        )
+        if new_rooms != current_rooms:
+            run_command(EditCommand(
+                "Update TryHackMe rooms",
+                [counter_change('tryhackme_rooms_completed', current_rooms, new_rooms)]
+            ), "total_tryhackme_rooms_input")
+            st.toast("TryHackMe rooms updated!")
 
-<p class='medium-font'><b>🔗 Essential Resource Links:</b></p>
-<ul>
-    <li><b>Google Cybersecurity Certificate (Coursera):</b> <a href="https://www.coursera.org/professional-certificates/google-cybersecurity" target="_blank">Link</a></li>
-    <li><b>Professor Messer (YouTube):</b> <a href="https://www.youtube.com/@professormesser" target="_blank">Search “Security+ SY0-601” or “SY0-701” playlists</a></li>
-    <li><b>TryHackMe:</b> <a href="https://tryhackme.com/" target="_blank">Link</a></li>
-    <li><b>Top Job Boards:</b> Indeed, LinkedIn Jobs, Glassdoor, CyberSN, Monster, ZipRecruiter</li>
-    <li><b>Networking:</b> LinkedIn is key. Also explore cybersecurity Discord groups like “The Many Hats Club.”</li>
-    <li><b>Deeper Cybersecurity Reading:</b> OWASP Top Ten, CVE Database, NIST Cybersecurity Framework.</li>
-</ul>
+    with thm_col2:
+        current_points = store.manifest['tryhackme_points_gained']
+        new_points = st.number_input(
+            "Total TryHackMe Points Gained:",
+            min_value=0,
+            value=current_points,
+            step=10,
+            key="total_tryhackme_points_input"
+        )
+        if new_points != current_points:
+            run_command(EditCommand(
+                "Update TryHackMe points",
+                [counter_change('tryhackme_points_gained', current_points, new_points)]
+            ), "total_tryhackme_points_input")
+            st.toast("TryHackMe points updated!")
 
-<p class='medium-font'><b>🧠 Remember Self-Care:</b> This sprint is intense. Prioritize rest, healthy food, and breaks to stay sharp and avoid burnout.</p>
-""", unsafe_allow_html=True)
+    # --- TryHackMe History & Rates ---
+    # Gains per sprint week come from the counter histories; focus time and TryHackMe
+    # plan tasks come from the per-week summaries in the manifest.
+    week_summaries = store.week_summaries()
+    thm_rooms_series = store.history['tryhackme_rooms_completed']
+    thm_points_series = store.history['tryhackme_points_gained']
+    sprint_start_timestamp = time.mktime(sprint_start.timetuple())
+    sprint_week_edges = sprint_start_timestamp + np.arange(len(week_summaries) + 1) * SECONDS_PER_WEEK
+    rooms_per_sprint_week = thm_rooms_series.gains(sprint_week_edges)
+    points_per_sprint_week = thm_points_series.gains(sprint_week_edges)
+    focus_hours_per_week = np.array([summary['focus_seconds'] for summary in week_summaries]) / 3600
+    thm_tasks_completed = np.array([summary['completed'].get('TryHackMe', 0) for summary in week_summaries])
+    thm_tasks_planned = np.array([summary['total'].get('TryHackMe', 0) for summary in week_summaries])
+
+    elapsed_sprint_weeks = current_sprint_day / 7
+    rooms_per_week_rate = rooms_per_sprint_week.sum() / elapsed_sprint_weeks
+    total_focus_hours = focus_hours_per_week.sum()
+    points_per_focus_hour = points_per_sprint_week.sum() / total_focus_hours if total_focus_hours > 0 else 0
+
+    thm_rate_col1, thm_rate_col2, thm_rate_col3 = st.columns(3)
+    with thm_rate_col1:
+        st.metric("Rooms per Week", f"{rooms_per_week_rate:.1f}")
+    with thm_rate_col2:
+        st.metric("Points per Focus Hour", f"{points_per_focus_hour:.0f}")
+    with thm_rate_col3:
+        st.metric("TryHackMe Plan Tasks Done", f"{thm_tasks_completed.sum()} / {thm_tasks_planned.sum()}")
+
+    with st.expander("📈 TryHackMe History", expanded=False):
+        if len(thm_rooms_series) == 0 and len(thm_points_series) == 0:
+            st.info("No TryHackMe updates recorded yet. Your history will appear here as you update your totals.")
+        else:
+            history_col1, history_col2 = st.columns(2)
+            for history_col, series, label in (
+                (history_col1, thm_rooms_series, "Rooms Completed"),
+                (history_col2, thm_points_series, "Points Gained"),
+            ):
+                with history_col:
+                    sample_times, sample_values = series.downsample(THM_CHART_MAX_POINTS)
+                    st.markdown(f"**{label}**")
+                    st.line_chart(pd.DataFrame({label: sample_values}, index=pd.to_datetime(sample_times, unit='s')))
+        st.markdown("**Week by Week:**")
+        with np.errstate(divide='ignore', invalid='ignore'):
+            weekly_points_per_hour = np.where(focus_hours_per_week > 0, points_per_sprint_week / focus_hours_per_week, 0)
+        st.dataframe(pd.DataFrame({
+            'Week': np.arange(1, len(week_summaries) + 1),
+            'Rooms Gained': rooms_per_sprint_week,
+            'Points Gained': points_per_sprint_week,
+            'Focus Hours': np.round(focus_hours_per_week, 1),
+            'Points / Focus Hour': np.round(weekly_points_per_hour, 0),
+            'TryHackMe Tasks Done': thm_tasks_completed,
+            'TryHackMe Tasks Planned': thm_tasks_planned,
+        }), hide_index=True)
+
+def sprints_section():
+    st.header("🏁 Sprints:")
+    st.markdown(f"<p class='medium-font'>Active sprint: <b>{active_sprint.name}</b> (started {sprint_start.strftime('%B %d, %Y')})</p>", unsafe_allow_html=True)
+
+    # Archived sprints are compared from their precomputed summaries, without opening the archives
+    archive_index = load_archive_index(DATA_DIR)
+    sprint_summaries = list(archive_index.values()) + [summarize_sprint(store, active_sprint)]
+    comparison = pd.DataFrame([{
+        'Sprint': f"#{summary['sprint']['number']} {summary['sprint']['name']}",
+        'Start': summary['sprint']['start_date'],
+        'Status': "Archived" if 'archived_at' in summary else "Active",
+        'Completion %': summary['completion_pct'],
+        'Tasks Done': f"{summary['completed_tasks']} / {summary['total_tasks']}",
+        'Active Days': summary['active_days'],
+        'Focus Hours': summary['focus_hours'],
+        'Jobs Applied': summary['jobs_applied'],
+        'THM Rooms': summary['tryhackme_rooms_completed'],
+        'THM Points': summary['tryhackme_points_gained'],
+    } for summary in sprint_summaries])
+    st.dataframe(comparison, hide_index=True)
+    if len(sprint_summaries) > 1:
+        st.bar_chart(comparison.set_index('Sprint')[['Completion %']], horizontal=True)
+
+    if archive_index:
+        download_id = st.selectbox(
+            "Download an archived sprint:", list(archive_index),
+            format_func=lambda sprint_id: archive_index[sprint_id]['sprint']['name'], key="archive_download_choice"
+        )
+        # The archive is read only when the button is clicked, not on every render
+        st.download_button("⬇️ Download (.json.gz)", lambda: read_archive(DATA_DIR, download_id),
+                           file_name=f"{download_id}.json.gz", mime="application/gzip", key="archive_download_button")
+
+    st.markdown("---")
+    st.subheader("Start a New Sprint")
+    st.info(f"This archives **{active_sprint.name}** into compressed, read-only storage and starts a fresh copy of the plan. It cannot be undone, but the archived sprint stays in the comparison above.")
+    new_sprint_col1, new_sprint_col2 = st.columns(2)
+    with new_sprint_col1:
+        new_sprint_name = st.text_input("Name:", value=f"Sprint {active_sprint.number + 1}", key="new_sprint_name")
+    with new_sprint_col2:
+        new_sprint_start = st.date_input("Start Date:", value=date.today(), key="new_sprint_start")
+    confirm_archive = st.checkbox(f"Yes, archive {active_sprint.name}", key="confirm_archive_sprint")
+    if st.button("🏁 Archive & Start New Sprint", key="archive_sprint_button", disabled=not confirm_archive or not new_sprint_name.strip()):
+        archive_sprint(store, active_sprint)
+        new_sprint = Sprint(active_sprint.number + 1, new_sprint_name.strip(), new_sprint_start, TOTAL_SPRINT_DAYS)
+        save_active_sprint(DATA_DIR, new_sprint)
+        st.session_state.active_sprint = new_sprint
+        st.session_state.command_log = CommandLog() # Earlier edits belong to the archived sprint
+        clear_all_views()
+        for sprint_key in ('selected_day', 'day_picker', 'new_sprint_name', 'new_sprint_start', 'confirm_archive_sprint'):
+            st.session_state.pop(sprint_key, None)
+        st.toast(f"{active_sprint.name} archived. {new_sprint.name} has begun! 🚀")
+        rerun()
+
+def resources_section():
+    st.header("💡 Important Notes & Key Resources:")
+    st.markdown(RESOURCES_MARKUP, unsafe_allow_html=True)
+
+SECTIONS = {
+    "📝 Today": today_section,
+    "📊 Progress": progress_section,
+    "💼 Jobs": jobs_section,
+    "⏰ Timer": timer_section,
+    "✍️ Notes": notes_section,
+    "🎮 TryHackMe": tryhackme_section,
+    "🏁 Sprints": sprints_section,
+    "💡 Resources": resources_section,
+}
 
 st.markdown("---")
+section_tabs = st.tabs(list(SECTIONS), key="active_section", on_change="rerun")
+for section_tab, render_section in zip(section_tabs, SECTIONS.values()):
+    if section_tab.open:
+        with section_tab:
+            render_section()
 
-# --- Data Reset Button ---
-st.header("reset All Data:")
-st.warning(" This will permanently delete ALL your tracked progress (tasks, notes, timer, job apps, TryHackMe data). This cannot be undone!")
-if st.button("Permanently Delete All Data", key="reset_all_data_button"):
-    st.session_state.sprint_data = {
-        'tasks': {},
-        'notes': {},
-        'timer_data': {},
-        'jobs_applied_daily': {},
-        'tryhackme_rooms_completed': 0,
-        'tryhackme_points_gained': 0
-    }
-    save_data(st.session_state.sprint_data)
-    st.toast("All sprint data has been reset! Starting fresh...")
-    st.rerun() # Rerun to reflect the cleared data
+# --- Undo / Redo ---
+with undo_bar:
+    last_command = command_log.undo_stack[-1] if command_log.undo_stack else None
+    if isinstance(last_command, ResetCommand) and last_command.seconds_left() > 0:
+        st.warning(f"All data was reset. You can undo this for another {math.ceil(last_command.seconds_left() / 60)} minute(s).")
+    undo_col, redo_col, _ = st.columns([1, 1, 3])
+    with undo_col:
+        undo_label = f"↩️ Undo: {last_command.label}" if last_command else "↩️ Undo"
+        if st.button(undo_label, key="undo_button", disabled=last_command is None):
+            try:
+                refresh_views(command_log.undo(store))
+                rerun()
+            except CommandError as e:
+                st.error(str(e))
+    with redo_col:
+        next_command = command_log.redo_stack[-1] if command_log.redo_stack else None
+        redo_label = f"↪️ Redo: {next_command.label}" if next_command else "↪️ Redo"
+        if st.button(redo_label, key="redo_button", disabled=next_command is None):
+            refresh_views(command_log.redo(store))
+            rerun()
 
 st.markdown("---")
 st.markdown("<p style='text-align: center; color: gray;'>Designed to empower your cybersecurity career launch. Good luck!</p>", unsafe_allow_html=True)
 
+# --- Render Stats ---
+last_render = finish_interaction(st.session_state.get('active_section') or next(iter(SECTIONS)))
+with st.sidebar.expander("📶 Render Stats", expanded=False):
+    if last_render:
+        st.metric("Sent This Interaction", f"{last_render['bytes_sent'] / 1024:.1f} KB",
+                  help=f"{last_render['messages']} websocket message(s), before compression")
+        st.metric("Server Render Time", f"{last_render['render_ms']:.0f} ms")
+    else:
+        st.caption("Metering is unavailable with this Streamlit version.")
+    st.dataframe(pd.DataFrame(section_averages(st.session_state.get('render_stats', []))), hide_index=True)
+
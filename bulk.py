@@ -0,0 +1,45 @@
+"""Batched edits that touch many tasks at once.
+
+Each builder reads the current data and returns a single EditCommand. Executing it
+writes every change in memory and persists each touched week in one
+SprintStore.write_changes() pass, which also refreshes the manifest summaries the
+progress bars are computed from. Undoing it replays the inverse the same way.
+"""
+from commands import EditCommand, day_change
+from storage import week_for_day
+
+
+def completion_command(store, day_nums, completed, task_type=None):
+    """Marks every task on day_nums (optionally only one pillar) complete or incomplete."""
+    changes = []
+    shards = store.read_weeks(week_for_day(day_num) for day_num in day_nums)
+    for day_num in day_nums:
+        day_tasks = shards[week_for_day(day_num)]['tasks'][str(day_num)]
+        for position, task in enumerate(day_tasks):
+            if task['completed'] != completed and (task_type is None or task['type'] == task_type):
+                changes.append(day_change(day_num, ('tasks', position, 'completed'), task['completed'], completed))
+    label = f"Mark {len(changes)} task(s) {'complete' if completed else 'incomplete'}"
+    return EditCommand(label, changes)
+
+
+def copy_command(store, from_day, to_day, positions, move=False):
+    """Copies (or, with move=True, shifts) tasks from one day to the end of another.
+
+    Copies start unchecked; moved tasks keep their status.
+    """
+    shards = store.read_weeks([week_for_day(from_day), week_for_day(to_day)])
+    source = shards[week_for_day(from_day)]['tasks'][str(from_day)]
+    target = shards[week_for_day(to_day)]['tasks'][str(to_day)]
+    selected = sorted({p for p in positions if 0 <= p < len(source)})
+    if from_day == to_day or not selected:
+        return EditCommand("Copy tasks", [])
+    if move:
+        new_source = [task for p, task in enumerate(source) if p not in selected]
+        new_target = target + [source[p] for p in selected]
+        changes = [day_change(from_day, ('tasks',), source, new_source)]
+    else:
+        new_target = target + [dict(source[p], completed=False) for p in selected]
+        changes = []
+    changes.append(day_change(to_day, ('tasks',), target, new_target))
+    verb = "Shift" if move else "Copy"
+    return EditCommand(f"{verb} {len(selected)} task(s) from Day {from_day} to Day {to_day}", changes)
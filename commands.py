@@ -0,0 +1,120 @@
+"""Undoable edits to sprint data.
+
+Every change goes through a command. Field edits are kept as deltas: the old and
+new value of just the fields they touch, never a copy of the dataset. Undo writes
+the old values back through the same save pass, so it costs the same as the
+original edit. A reset moves the data files aside instead of deleting them, so it
+can be undone until its grace period runs out.
+"""
+import copy
+import os
+import time
+from collections import deque, namedtuple
+
+
+UNDO_LIMIT = 50
+
+# kind 'day':     target is a day number; path is the section then any keys inside
+#                 that day's record, e.g. ('notes',) or ('tasks', 2, 'completed')
+# kind 'counter': target is a global counter name; path is ()
+Change = namedtuple('Change', ['kind', 'target', 'path', 'old', 'new'])
+
+
+class CommandError(Exception):
+    """Raised when a command can no longer be undone."""
+
+
+def day_change(day_num, path, old, new):
+    """A change to one field of a day's record. Values are copied so later edits can't alias them."""
+    return Change('day', day_num, tuple(path), copy.deepcopy(old), copy.deepcopy(new))
+
+
+def counter_change(key, old, new):
+    return Change('counter', key, (), old, new)
+
+
+class EditCommand:
+    """A batch of field changes, written and saved together."""
+
+    def __init__(self, label, changes):
+        self.label = label
+        self.changes = list(changes)
+
+    def _write(self, store, use_new):
+        day_values, counters = [], {}
+        for change in self.changes:
+            value = copy.deepcopy(change.new if use_new else change.old)
+            if change.kind == 'day':
+                day_values.append((change.target, change.path, value))
+            else:
+                counters[change.target] = value
+        store.write_changes(day_values, counters)
+
+    def apply(self, store):
+        self._write(store, use_new=True)
+
+    def revert(self, store):
+        self._write(store, use_new=False)
+
+
+class ResetCommand:
+    """Starts the sprint from scratch, keeping the old data in the store's trash for a grace period."""
+
+    label = "Reset all data"
+
+    def __init__(self, grace_seconds):
+        self.grace_seconds = grace_seconds
+        self.trash_dir = None
+        self.reset_at = None
+
+    def apply(self, store):
+        self.trash_dir = store.soft_reset()
+        self.reset_at = time.time()
+
+    def seconds_left(self):
+        """Seconds remaining in which the reset can still be undone."""
+        if self.trash_dir is None or not os.path.isdir(self.trash_dir):
+            return 0
+        return max(0, self.grace_seconds - (time.time() - self.reset_at))
+
+    def revert(self, store):
+        if self.seconds_left() <= 0:
+            raise CommandError("The grace period for undoing the reset has passed.")
+        store.restore_reset(self.trash_dir)
+        self.trash_dir = None
+
+
+class CommandLog:
+    """Bounded undo/redo stacks of executed commands."""
+
+    def __init__(self, limit=UNDO_LIMIT):
+        self.undo_stack = deque(maxlen=limit)
+        self.redo_stack = []
+
+    def execute(self, store, command):
+        """Applies a command and makes it undoable. Edits that change nothing are skipped."""
+        if isinstance(command, EditCommand):
+            command.changes = [c for c in command.changes if c.old != c.new]
+            if not command.changes:
+                return None
+        command.apply(store)
+        self.undo_stack.append(command)
+        self.redo_stack.clear()
+        return command
+
+    def undo(self, store):
+        command = self.undo_stack.pop()
+        try:
+            command.revert(store)
+        except CommandError:
+            # Everything older was recorded against the data this command replaced
+            self.undo_stack.clear()
+            raise
+        self.redo_stack.append(command)
+        return command
+
+    def redo(self, store):
+        command = self.redo_stack.pop()
+        command.apply(store)
+        self.undo_stack.append(command)
+        return command
@@ -0,0 +1,69 @@
+"""Append-only time series for counters such as TryHackMe rooms and points.
+
+Each sample is a fixed-size (timestamp, value) record appended to a small binary
+file, so recording an update never rewrites the history. In memory a series is a
+pair of numpy arrays, which keeps long-history queries vectorized.
+"""
+import os
+
+import numpy as np
+
+SAMPLE_DTYPE = np.dtype([('timestamp', '<f8'), ('value', '<i8')])
+SECONDS_PER_WEEK = 7 * 24 * 3600
+
+
+class MetricSeries:
+    """A timestamped counter history backed by numpy arrays and a binary file."""
+
+    def __init__(self, path):
+        self.path = path
+        if os.path.exists(path):
+            samples = np.fromfile(path, dtype=SAMPLE_DTYPE)
+        else:
+            samples = np.empty(0, dtype=SAMPLE_DTYPE)
+        self.timestamps = samples['timestamp'].copy()
+        self.values = samples['value'].copy()
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def record(self, timestamp, value):
+        """Appends one sample in memory and on disk."""
+        sample = np.array([(timestamp, value)], dtype=SAMPLE_DTYPE)
+        with open(self.path, 'ab') as f:
+            sample.tofile(f)
+        self.timestamps = np.append(self.timestamps, timestamp)
+        self.values = np.append(self.values, value)
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self.timestamps = np.empty(0, dtype=np.float64)
+        self.values = np.empty(0, dtype=np.int64)
+
+    def value_at(self, timestamps):
+        """Returns the counter value in effect at each timestamp.
+
+        Before the first sample the first recorded value is used, so no gain is
+        attributed to time before the history started.
+        """
+        if len(self) == 0:
+            return np.zeros(len(timestamps), dtype=np.int64)
+        idx = np.searchsorted(self.timestamps, timestamps, side='right') - 1
+        return self.values[np.clip(idx, 0, len(self) - 1)]
+
+    def gains(self, edges):
+        """Returns how much the counter grew between consecutive edge timestamps."""
+        return np.diff(self.value_at(np.asarray(edges, dtype=np.float64)))
+
+    def downsample(self, max_points):
+        """Returns (timestamps, values) with at most max_points samples for charting.
+
+        The history is split into equal time buckets and the last sample of each is
+        kept, which preserves the shape of a cumulative counter.
+        """
+        if len(self) <= max_points:
+            return self.timestamps, self.values
+        bucket_ends = np.linspace(self.timestamps[0], self.timestamps[-1], max_points + 1)[1:]
+        idx = np.unique(np.searchsorted(self.timestamps, bucket_ends, side='right') - 1)
+        return self.timestamps[idx], self.values[idx]
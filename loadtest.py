@@ -0,0 +1,548 @@
+"""Concurrent-session load test for the sprint dashboard.
+
+For each storage mode, starts app.py once with `streamlit run` against a fresh
+data directory and connects every simulated learner to that one server over
+Streamlit's websocket protocol, the way browser tabs do. The sessions share the
+server's script threads, caches and data files, so this measures the deployed
+app. Each session follows a realistic script: open the app, jump to its own day,
+toggle that day's tasks, type notes in a few edits, and start and stop the focus
+timer, switching to each section's tab.
+
+Reports throughput, p50/p95/p99 interaction latency (the cold first page load is
+reported separately under 'load'), the websocket bytes received and the server
+render time the app reported for each interaction, errors raised by the app
+(file contention shows up here) and lost updates: writes a session made that are
+no longer on disk once every session has finished.
+
+Fallback: `--driver apptest` runs the same script with Streamlit's AppTest
+harness instead, for environments where a server cannot be started. AppTest
+keeps global runtime state and is not thread-safe, so every session then runs in
+its own process with its own runtime: it measures contention on the data files,
+not a shared server.
+
+Usage:
+    python loadtest.py --sessions 20 --rounds 2 --modes sharded single
+    python loadtest.py --driver apptest --sessions 5
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import queue
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import aiohttp
+import numpy as np
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+from streamlit.testing.v1 import AppTest
+
+from storage import STORAGE_MODES
+
+APP_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app.py')
+NOTE_EDITS_PER_ROUND = 3
+APP_TIMEOUT_SECONDS = 120
+SESSION_START_TIMEOUT_SECONDS = 300
+SERVER_START_TIMEOUT_SECONDS = 60
+# Widget ids the server assigns look like "$$ID-<hash>-<key>" for keyed widgets
+WIDGET_ID_PREFIX = '$$ID-'
+RENDER_TIME_LABEL = "Server Render Time"
+# Points the app's legacy import at a file that never exists, so a learner's real
+# sprint_data.json next to app.py is never imported (and renamed) by a test run
+NO_LEGACY_FILE = 'no_legacy_data.json'
+# Tab labels of the app's sections
+TODAY_SECTION = "📝 Today"
+NOTES_SECTION = "✍️ Notes"
+TIMER_SECTION = "⏰ Timer"
+
+
+class SessionRecorder:
+    """Collects latencies, errors and the final writes of one simulated session."""
+
+    def __init__(self, session_id, day_num):
+        self.session_id = session_id
+        self.day_num = day_num
+        self.latencies = []  # (action, seconds)
+        self.renders = []  # (action, bytes sent, server render ms) for each interaction
+        self.errors = []
+        self.final_note = None
+        self.checked_tasks = 0
+
+
+def app_env(data_dir, mode='sharded'):
+    """Environment that runs the app against data_dir only, with the given storage mode."""
+    return {
+        'SPRINT_DATA_DIR': data_dir,
+        'SPRINT_STORAGE_MODE': mode,
+        'SPRINT_LEGACY_FILE': os.path.join(data_dir, NO_LEGACY_FILE),
+    }
+
+
+class StreamlitServer:
+    """`streamlit run app.py` in a child process, serving one data directory."""
+
+    def __init__(self, env, cwd):
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            self.port = sock.getsockname()[1]
+        self.log = tempfile.TemporaryFile()
+        self.process = subprocess.Popen(
+            [sys.executable, '-m', 'streamlit', 'run', APP_FILE, '--server.headless', 'true',
+             '--server.address', '127.0.0.1', '--server.port', str(self.port),
+             '--browser.gatherUsageStats', 'false'],
+            env=env, cwd=cwd, stdout=self.log, stderr=subprocess.STDOUT
+        )
+
+    @property
+    def stream_url(self):
+        return f"ws://127.0.0.1:{self.port}/_stcore/stream"
+
+    async def wait_until_healthy(self, http):
+        deadline = time.monotonic() + SERVER_START_TIMEOUT_SECONDS
+        while time.monotonic() < deadline and self.process.poll() is None:
+            try:
+                async with http.get(f"http://127.0.0.1:{self.port}/_stcore/health") as response:
+                    if response.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(0.2)
+        self.log.seek(0)
+        raise RuntimeError(f"streamlit server did not start:\n{self.log.read().decode(errors='replace')[-2000:]}")
+
+    def stop(self):
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+        self.log.close()
+
+
+class ServerSession:
+    """One browser tab on the server, speaking Streamlit's websocket protocol.
+
+    Like the browser, it sends the state of every widget on the page with each
+    rerun request, and times an interaction until the server reports the script
+    run finished (following any st.rerun() to the run that completes it).
+    """
+
+    def __init__(self, recorder, ws):
+        self.recorder = recorder
+        self.ws = ws
+        self.widgets = {}  # key -> (widget id, element) of the widgets on the page
+        self.states = {}  # widget id -> WidgetState the browser holds for it
+
+    def value(self, key):
+        widget_id, element = self.widgets[key]
+        if widget_id in self.states:
+            return getattr(self.states[widget_id], self.states[widget_id].WhichOneof('value'))
+        return element.value if element.set_value else element.default
+
+    def keys(self, prefix):
+        return [key for key in self.widgets if key.startswith(prefix)]
+
+    def set_value(self, key, **value):
+        widget_id = self.widgets[key][0]
+        state = WidgetState(id=widget_id)
+        for field, field_value in value.items():
+            if field == 'string_array_value':
+                state.string_array_value.data.extend(field_value)
+            else:
+                setattr(state, field, field_value)
+        self.states[widget_id] = state
+
+    async def run(self, action, trigger_key=None):
+        """Sends a rerun request, recording latency, bytes received and any app error."""
+        msg = BackMsg()
+        msg.rerun_script.query_string = ''
+        msg.rerun_script.page_script_hash = ''
+        page_ids = {widget_id for widget_id, _ in self.widgets.values()}
+        msg.rerun_script.widget_states.widgets.extend(
+            state for widget_id, state in self.states.items() if widget_id in page_ids
+        )
+        if trigger_key is not None:
+            msg.rerun_script.widget_states.widgets.append(
+                WidgetState(id=self.widgets[trigger_key][0], trigger_value=True)
+            )
+        started = time.perf_counter()
+        try:
+            await self.ws.send_bytes(msg.SerializeToString())
+            received, render_ms, errors = await asyncio.wait_for(self.read_run(), APP_TIMEOUT_SECONDS)
+        except Exception as e:
+            self.recorder.errors.append(f"{action}: {type(e).__name__}: {e}")
+            return False
+        self.recorder.latencies.append((action, time.perf_counter() - started))
+        self.recorder.renders.append((action, received, render_ms))
+        self.recorder.errors.extend(f"{action}: {error}" for error in errors)
+        return not errors
+
+    async def read_run(self):
+        """Reads forward messages until a script run finishes; returns (bytes, render ms, errors)."""
+        received, render_ms, errors, widgets = 0, 0.0, [], {}
+        while True:
+            ws_msg = await self.ws.receive()
+            if ws_msg.type != aiohttp.WSMsgType.BINARY:
+                raise ConnectionError(f"websocket closed ({ws_msg.type.name})")
+            received += len(ws_msg.data)
+            msg = ForwardMsg()
+            msg.ParseFromString(ws_msg.data)
+            msg_type = msg.WhichOneof('type')
+            if msg_type == 'delta' and msg.delta.WhichOneof('type') == 'new_element':
+                element_type = msg.delta.new_element.WhichOneof('type')
+                element = getattr(msg.delta.new_element, element_type)
+                if element_type == 'exception':
+                    errors.append(element.message)
+                elif element_type == 'metric' and element.label == RENDER_TIME_LABEL:
+                    render_ms = float(element.body.split()[0])
+                elif getattr(element, 'id', '').startswith(WIDGET_ID_PREFIX):
+                    widgets[element.id.split('-', 2)[2]] = (element.id, element)
+            elif msg_type == 'delta' and msg.delta.add_block.WhichOneof('type') == 'tab_container':
+                tab_id = msg.delta.add_block.tab_container.id
+                if tab_id.startswith(WIDGET_ID_PREFIX):
+                    widgets[tab_id.split('-', 2)[2]] = (tab_id, msg.delta.add_block.tab_container)
+            elif msg_type == 'script_finished':
+                if msg.script_finished == ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    widgets = {}
+                elif msg.script_finished == ForwardMsg.FINISHED_SUCCESSFULLY:
+                    self.widgets = widgets
+                    return received, render_ms, errors
+                elif msg.script_finished == ForwardMsg.FINISHED_WITH_COMPILE_ERROR:
+                    errors.append("script failed to compile")
+                    return received, render_ms, errors
+
+
+async def run_server_session(recorder, session, template, rounds, think_seconds):
+    """One learner's interaction script, as a browser tab on the shared server."""
+    rng = random.Random(recorder.session_id)
+
+    async def think():
+        await asyncio.sleep(rng.uniform(0, 2 * think_seconds))
+
+    if not await session.run('load'):
+        return
+
+    session.set_value("day_picker", string_array_value=[template[recorder.day_num]['date'].isoformat()])
+    if not await session.run('navigate'):
+        return
+
+    async def open_section(section):
+        session.set_value('active_section', string_value=section)
+        return await session.run('switch_tab')
+
+    day_str = str(recorder.day_num)
+    for round_num in range(rounds):
+        await think()
+        if not await open_section(TODAY_SECTION):
+            return
+        for key in session.keys(f"day_{day_str}_task_"):
+            if key in session.widgets and not session.value(key):
+                session.set_value(key, bool_value=True)
+                if not await session.run('toggle_task'):
+                    return
+                recorder.checked_tasks = max(recorder.checked_tasks, int(key.rsplit('_', 1)[1]) + 1)
+            await think()
+
+        if not await open_section(NOTES_SECTION):
+            return
+        for edit in range(NOTE_EDITS_PER_ROUND):
+            note = f"session {recorder.session_id} round {round_num} edit {edit}"
+            session.set_value(f"notes_day_{day_str}", string_value=note)
+            if not await session.run('type_note'):
+                return
+            recorder.final_note = note
+            await think()
+
+        if not await open_section(TIMER_SECTION):
+            return
+        if not await session.run('timer_start', trigger_key=f"start_timer_{day_str}"):
+            return
+        await think()
+        if not await session.run('timer_stop', trigger_key=f"stop_timer_{day_str}"):
+            return
+
+
+async def drive_server(server, recorders, template, rounds, think_seconds):
+    """Connects every session to the server, then runs them together; returns the run's duration."""
+    async with aiohttp.ClientSession() as http:
+        await server.wait_until_healthy(http)
+        # Received sizes are the payload before websocket compression, like the app's own meter
+        sockets = [await http.ws_connect(server.stream_url, protocols=['streamlit'], compress=0,
+                                         max_msg_size=0) for _ in recorders]
+        started = time.perf_counter()
+        try:
+            outcomes = await asyncio.gather(*(
+                run_server_session(recorder, ServerSession(recorder, ws), template, rounds, think_seconds)
+                for recorder, ws in zip(recorders, sockets)
+            ), return_exceptions=True)
+        finally:
+            for ws in sockets:
+                await ws.close()
+        for recorder, outcome in zip(recorders, outcomes):
+            if isinstance(outcome, BaseException):
+                recorder.errors.append(f"session crashed: {type(outcome).__name__}: {outcome}")
+        return time.perf_counter() - started
+
+
+def run_server_sessions(mode, data_dir, sessions, rounds, think_seconds, template, total_days):
+    """Runs every session against one `streamlit run` server; returns (recorders, duration)."""
+    recorders = [SessionRecorder(i, 1 + i % total_days) for i in range(sessions)]
+    # Run from the scratch data directory, so no relative path can reach the repo's files
+    server = StreamlitServer(dict(os.environ, **app_env(data_dir, mode)), cwd=data_dir)
+    try:
+        duration = asyncio.run(drive_server(server, recorders, template, rounds, think_seconds))
+    finally:
+        server.stop()
+    return recorders, duration
+
+
+def timed_run(recorder, action, at):
+    """Reruns the app after an interaction, recording latency and any app error."""
+    started = time.perf_counter()
+    try:
+        at.run()
+    except Exception as e:
+        recorder.errors.append(f"{action}: {type(e).__name__}: {e}")
+        return False
+    recorder.latencies.append((action, time.perf_counter() - started))
+    if 'render_stats' in at.session_state:
+        render = at.session_state.render_stats[-1]
+        recorder.renders.append((action, render['bytes_sent'], render['render_ms']))
+    for exception in at.exception:
+        recorder.errors.append(f"{action}: {exception.message}")
+    return not at.exception
+
+
+def run_session(recorder, template, rounds, think_seconds, start_barrier):
+    """One learner's interaction script, on the AppTest fallback driver."""
+    rng = random.Random(recorder.session_id)
+
+    def think():
+        time.sleep(rng.uniform(0, 2 * think_seconds))
+
+    at = AppTest.from_file(APP_FILE, default_timeout=APP_TIMEOUT_SECONDS)
+    start_barrier.wait(timeout=SESSION_START_TIMEOUT_SECONDS)
+    if not timed_run(recorder, 'load', at):
+        return
+
+    at.date_input(key="day_picker").set_value(template[recorder.day_num]['date'])
+    if not timed_run(recorder, 'navigate', at):
+        return
+
+    def open_section(section):
+        at.session_state['active_section'] = section
+        return timed_run(recorder, 'switch_tab', at)
+
+    day_str = str(recorder.day_num)
+    for round_num in range(rounds):
+        think()
+        if not open_section(TODAY_SECTION):
+            return
+        task_keys = [cb.key for cb in at.checkbox if cb.key and cb.key.startswith(f"day_{day_str}_task_")]
+        for key in task_keys:
+            if not at.checkbox(key=key).value:
+                at.checkbox(key=key).check()
+                if not timed_run(recorder, 'toggle_task', at):
+                    return
+                recorder.checked_tasks = max(recorder.checked_tasks, int(key.rsplit('_', 1)[1]) + 1)
+            think()
+
+        if not open_section(NOTES_SECTION):
+            return
+        for edit in range(NOTE_EDITS_PER_ROUND):
+            note = f"session {recorder.session_id} round {round_num} edit {edit}"
+            at.text_area(key=f"notes_day_{day_str}").input(note)
+            if not timed_run(recorder, 'type_note', at):
+                return
+            recorder.final_note = note
+            think()
+
+        if not open_section(TIMER_SECTION):
+            return
+        at.button(key=f"start_timer_{day_str}").click()
+        if not timed_run(recorder, 'timer_start', at):
+            return
+        think()
+        at.button(key=f"stop_timer_{day_str}").click()
+        if not timed_run(recorder, 'timer_stop', at):
+            return
+
+
+def session_worker(recorder, template, rounds, think_seconds, start_barrier, results):
+    """Process entry point: runs one session and sends its recorder back."""
+    try:
+        run_session(recorder, template, rounds, think_seconds, start_barrier)
+    except Exception as e:
+        recorder.errors.append(f"session crashed: {type(e).__name__}: {e}")
+    results.put(recorder)
+
+
+def count_lost_updates(mode, data_dir, template, total_days, recorders):
+    """Reloads the data from disk and counts writes that did not survive."""
+    store = STORAGE_MODES[mode](data_dir, template, total_days)
+    lost = 0
+    notes_by_day = {}
+    for recorder in recorders:
+        if recorder.final_note is not None:
+            notes_by_day.setdefault(recorder.day_num, set()).add(recorder.final_note)
+        tasks = store.shard_for_day(recorder.day_num)['tasks'][str(recorder.day_num)]
+        lost += sum(1 for task in tasks[:recorder.checked_tasks] if not task['completed'])
+    for day_num, expected_notes in notes_by_day.items():
+        # Sessions sharing a day overwrite each other's notes; one of their final notes must win
+        if store.shard_for_day(day_num)['notes'][str(day_num)] not in expected_notes:
+            lost += 1
+    return lost
+
+
+def percentile_ms(latencies, q):
+    return float(np.percentile(latencies, q) * 1000) if len(latencies) else 0.0
+
+
+def run_apptest_sessions(mode, data_dir, sessions, rounds, think_seconds, template, total_days):
+    """Fallback: runs every session in its own AppTest process; returns (recorders, duration)."""
+    os.environ.update(app_env(data_dir, mode))
+    mp_context = multiprocessing.get_context('spawn')
+    # One extra party so the clock starts when the sessions are released, not while they boot
+    start_barrier = mp_context.Barrier(sessions + 1)
+    results = mp_context.Queue()
+    workers = [
+        mp_context.Process(
+            target=session_worker,
+            args=(SessionRecorder(i, 1 + i % total_days), template, rounds, think_seconds, start_barrier, results)
+        )
+        for i in range(sessions)
+    ]
+    for worker in workers:
+        worker.start()
+    start_barrier.wait(timeout=SESSION_START_TIMEOUT_SECONDS)
+    started = time.perf_counter()
+    recorders = []
+    for _ in workers:
+        try:
+            recorders.append(results.get(timeout=SESSION_START_TIMEOUT_SECONDS))
+        except queue.Empty:
+            break
+    duration = time.perf_counter() - started
+    for worker in workers:
+        worker.join()
+    return recorders, duration
+
+
+DRIVERS = {
+    'server': run_server_sessions,
+    'apptest': run_apptest_sessions,
+}
+
+
+def run_mode(mode, driver, sessions, rounds, think_seconds, template, total_days):
+    """Runs every session against a fresh data directory using the given storage mode."""
+    data_dir = tempfile.mkdtemp(prefix=f"sprint_loadtest_{mode}_")
+    recorders, duration = DRIVERS[driver](mode, data_dir, sessions, rounds, think_seconds, template, total_days)
+
+    latencies = np.array([seconds for r in recorders for action, seconds in r.latencies if action != 'load'])
+    by_action = {}
+    for recorder in recorders:
+        for action, seconds in recorder.latencies:
+            by_action.setdefault(action, []).append(seconds)
+    renders_by_action = {}
+    for recorder in recorders:
+        for action, bytes_sent, render_ms in recorder.renders:
+            renders_by_action.setdefault(action, []).append((bytes_sent, render_ms))
+    renders = np.array([(b, ms) for r in recorders for action, b, ms in r.renders if action != 'load']).reshape(-1, 2)
+    result = {
+        'mode': mode,
+        'driver': driver,
+        'sessions': len(recorders),
+        'interactions': int(len(latencies)),
+        'duration_s': round(duration, 2),
+        'throughput_per_s': round(len(latencies) / duration, 2) if duration > 0 else 0,
+        'p50_ms': round(percentile_ms(latencies, 50), 1),
+        'p95_ms': round(percentile_ms(latencies, 95), 1),
+        'p99_ms': round(percentile_ms(latencies, 99), 1),
+        'avg_kb_sent': round(float(renders[:, 0].mean()) / 1024, 1) if len(renders) else 0,
+        'avg_render_ms': round(float(renders[:, 1].mean()), 1) if len(renders) else 0,
+        'errors': sum(len(r.errors) for r in recorders),
+        'lost_updates': count_lost_updates(mode, data_dir, template, total_days, recorders),
+        'by_action': {
+            action: {'count': len(values), 'p50_ms': round(percentile_ms(values, 50), 1),
+                     'p95_ms': round(percentile_ms(values, 95), 1),
+                     'avg_kb_sent': round(float(np.mean([b for b, _ in renders_by_action.get(action, [(0, 0)])])) / 1024, 1),
+                     'avg_render_ms': round(float(np.mean([ms for _, ms in renders_by_action.get(action, [(0, 0)])])), 1)}
+            for action, values in sorted(by_action.items())
+        },
+        'sample_errors': [e for r in recorders for e in r.errors][:5],
+    }
+    shutil.rmtree(data_dir, ignore_errors=True)
+    return result
+
+
+def read_plan(scratch_dir):
+    """Runs the app once against a scratch directory and returns its task template."""
+    os.environ.update(app_env(scratch_dir))
+    at = AppTest.from_file(APP_FILE, default_timeout=APP_TIMEOUT_SECONDS)
+    at.run()
+    store = at.session_state.sprint_store
+    return store.template, store.total_days
+
+
+def probe_plan():
+    """Reads the task template in a child process, since AppTest replaces __main__."""
+    scratch_dir = tempfile.mkdtemp(prefix="sprint_loadtest_probe_")
+    try:
+        with multiprocessing.get_context('spawn').Pool(1) as pool:
+            return pool.apply(read_plan, (scratch_dir,))
+    finally:
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+
+
+def print_report(results):
+    columns = ['mode', 'driver', 'sessions', 'interactions', 'duration_s', 'throughput_per_s',
+               'p50_ms', 'p95_ms', 'p99_ms', 'avg_kb_sent', 'avg_render_ms', 'errors', 'lost_updates']
+    widths = [max(len(c), *(len(str(r[c])) for r in results)) for c in columns]
+    print('  '.join(c.ljust(w) for c, w in zip(columns, widths)))
+    for result in results:
+        print('  '.join(str(result[c]).ljust(w) for c, w in zip(columns, widths)))
+    for result in results:
+        print(f"\n[{result['mode']}] per action:")
+        for action, stats in result['by_action'].items():
+            print(f"  {action:<12} n={stats['count']:<5} p50={stats['p50_ms']}ms p95={stats['p95_ms']}ms"
+                  f" sent={stats['avg_kb_sent']}KB render={stats['avg_render_ms']}ms")
+        for error in result['sample_errors']:
+            print(f"  error: {error}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--sessions', type=int, default=10, help="Number of concurrent simulated learners")
+    parser.add_argument('--rounds', type=int, default=2, help="Interaction rounds per session")
+    parser.add_argument('--think-ms', type=float, default=50, help="Mean pause between interactions")
+    parser.add_argument('--modes', nargs='+', default=['sharded'], choices=sorted(STORAGE_MODES),
+                        help="Storage modes to run and compare")
+    parser.add_argument('--driver', default='server', choices=sorted(DRIVERS),
+                        help="'server' drives one streamlit server over websockets; 'apptest' is the in-process fallback")
+    parser.add_argument('--output', help="Also write the results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    template, total_days = probe_plan()
+    results = [
+        run_mode(mode, args.driver, args.sessions, args.rounds, args.think_ms / 1000, template, total_days)
+        for mode in args.modes
+    ]
+    print_report(results)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=4)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
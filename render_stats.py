@@ -0,0 +1,115 @@
+"""Per-interaction payload and server render time for the dashboard.
+
+While a script run is metered, every ForwardMsg Streamlit sends to the browser is
+counted at its serialized size. That is the websocket payload before compression,
+with messages the browser already has counted as the short cache reference that
+is actually sent. An interaction that reruns through rerun() below is one
+measurement spanning both runs; a run that ends any other way without reaching
+finish_interaction() (interrupted by a newer interaction, or raising) is dropped. Results are kept in session state, so the loadtest harness can read
+them as well as the app.
+
+Counting hooks a private attribute of Streamlit's script run context. If a
+Streamlit release changes it, metering switches itself off and only the stats
+panel goes empty.
+"""
+import time
+from collections import deque
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+RECENT_INTERACTIONS = 50
+
+
+class RunMeter:
+    """Bytes and messages sent, and wall time, for one interaction."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.bytes_sent = 0
+        self.messages = 0
+        self.continues = False  # Set by rerun(): the next run is part of this interaction
+
+    def count(self, msg):
+        self.bytes_sent += msg.ByteSize()
+        self.messages += 1
+
+
+def _meter_sender(ctx, meter):
+    """Routes the context's outgoing messages through meter; returns False if it cannot."""
+    try:
+        # The context may be reused between runs, so always wrap the original sender
+        send = getattr(ctx, '_unmetered_enqueue', None) or ctx._enqueue
+        if not callable(send):
+            return False
+
+        def metered_enqueue(msg):
+            try:
+                meter.count(msg)
+            except Exception:
+                pass
+            send(msg)
+
+        ctx._unmetered_enqueue = send
+        ctx._enqueue = metered_enqueue
+    except Exception:
+        return False
+    return True
+
+
+def start_interaction():
+    """Starts (or, after rerun(), continues) metering the current interaction.
+
+    Returns None when messages cannot be metered; the app then runs unmetered.
+    """
+    meter = st.session_state.get('render_meter')
+    if meter is None or not meter.continues:
+        # A leftover meter belongs to a run that never finished; its time is not this interaction's
+        meter = st.session_state.render_meter = RunMeter()
+    meter.continues = False
+    ctx = get_script_run_ctx()
+    if ctx is None or not _meter_sender(ctx, meter):
+        st.session_state.pop('render_meter', None)
+        return None
+    return meter
+
+
+def rerun():
+    """st.rerun(), metering the next run as part of the current interaction."""
+    meter = st.session_state.get('render_meter')
+    if meter is not None:
+        meter.continues = True
+    st.rerun()
+
+
+def finish_interaction(section):
+    """Records the current interaction under the section that was open and returns the record."""
+    meter = st.session_state.pop('render_meter', None)
+    if meter is None:
+        return None
+    record = {
+        'section': section,
+        'bytes_sent': meter.bytes_sent,
+        'messages': meter.messages,
+        'render_ms': (time.perf_counter() - meter.started) * 1000,
+    }
+    if 'render_stats' not in st.session_state:
+        st.session_state.render_stats = deque(maxlen=RECENT_INTERACTIONS)
+    st.session_state.render_stats.append(record)
+    return record
+
+
+def section_averages(records):
+    """Mean bytes sent and render time per section, for the stats panel."""
+    by_section = {}
+    for record in records:
+        by_section.setdefault(record['section'], []).append(record)
+    return [
+        {
+            'Section': section,
+            'Interactions': len(section_records),
+            'Avg KB Sent': round(sum(r['bytes_sent'] for r in section_records) / len(section_records) / 1024, 1),
+            'Avg Render ms': round(sum(r['render_ms'] for r in section_records) / len(section_records), 1),
+        }
+        for section, section_records in by_section.items()
+    ]
@@ -0,0 +1,107 @@
+"""In-memory indexes for searching tasks across every day of the sprint.
+
+Each task gets an integer id. Inverted indexes map a pillar type, a week, a
+completion status and each keyword token of the description to the set of task
+ids, so a query is a handful of set intersections rather than a scan of every day.
+Checking a task off moves its id between the status sets in place.
+"""
+import re
+from bisect import bisect_left
+
+from storage import days_in_week
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9+#]+")
+
+
+def tokenize(text):
+    """Splits text into lowercase keyword tokens ('Security+' stays 'security+')."""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class TaskIndex:
+    """Inverted indexes over every task in the sprint."""
+
+    def __init__(self):
+        self.tasks = []  # task id -> (day number, task position within the day, task dict)
+        self.ids = {}  # (day number, task position) -> task id
+        self.by_type = {}
+        self.by_week = {}
+        self.by_token = {}
+        self.completed = set()
+        self.pending = set()
+        self.vocabulary = []  # Sorted tokens, for prefix matching
+
+    @classmethod
+    def build(cls, store):
+        """Indexes every task in the store, reading shards without disturbing its LRU cache."""
+        index = cls()
+        for week_num in range(1, store.total_weeks + 1):
+            shard = store.read_week(week_num)
+            for day_num in days_in_week(week_num, store.total_days):
+                for position, task in enumerate(shard['tasks'][str(day_num)]):
+                    index._add(week_num, day_num, position, task)
+        index.vocabulary = sorted(index.by_token)
+        return index
+
+    def _add(self, week_num, day_num, position, task):
+        task_id = len(self.tasks)
+        self.tasks.append((day_num, position, task))
+        self.ids[(day_num, position)] = task_id
+        self.by_type.setdefault(task['type'], set()).add(task_id)
+        self.by_week.setdefault(week_num, set()).add(task_id)
+        for token in set(tokenize(task['desc'])):
+            self.by_token.setdefault(token, set()).add(task_id)
+        (self.completed if task['completed'] else self.pending).add(task_id)
+
+    def _ids_for_keyword(self, keyword):
+        """Ids of tasks with a token starting with keyword (so 'splu' finds 'Splunk')."""
+        matched = set()
+        start = bisect_left(self.vocabulary, keyword)
+        for token in self.vocabulary[start:]:
+            if not token.startswith(keyword):
+                break
+            matched |= self.by_token[token]
+        return matched
+
+    def query(self, types=None, status=None, weeks=None, keywords=""):
+        """Returns matching (day number, position, task) tuples in plan order.
+
+        Every filter is optional and they combine with AND: types and weeks match
+        any of the given values, status is 'completed' or 'pending', and every
+        keyword must prefix-match a token of the description.
+        """
+        candidate_sets = []
+        if types:
+            candidate_sets.append(set().union(*(self.by_type.get(t, set()) for t in types)))
+        if weeks:
+            candidate_sets.append(set().union(*(self.by_week.get(w, set()) for w in weeks)))
+        if status == 'completed':
+            candidate_sets.append(self.completed)
+        elif status == 'pending':
+            candidate_sets.append(self.pending)
+        for keyword in tokenize(keywords):
+            candidate_sets.append(self._ids_for_keyword(keyword))
+
+        if not candidate_sets:
+            return list(self.tasks)
+        # Intersect smallest first so the work is bounded by the most selective filter
+        candidate_sets.sort(key=len)
+        result = set(candidate_sets[0])
+        for candidates in candidate_sets[1:]:
+            result &= candidates
+            if not result:
+                break
+        return [self.tasks[task_id] for task_id in sorted(result)]
+
+    def set_completed(self, day_num, position, completed):
+        """Updates the status indexes after a task is checked or unchecked."""
+        task_id = self.ids.get((day_num, position))
+        if task_id is None:
+            return
+        self.tasks[task_id][2]['completed'] = completed
+        if completed:
+            self.pending.discard(task_id)
+            self.completed.add(task_id)
+        else:
+            self.completed.discard(task_id)
+            self.pending.add(task_id)
@@ -0,0 +1,158 @@
+"""Sprints: the active one in the hot store, finished ones in a compressed archive.
+
+Next to the active sprint's store files, the data directory holds:
+
+    sprint.json           - the active sprint: number, name, start date and length
+    archive/index.json    - a precomputed summary of every archived sprint
+    archive/<id>.json.gz  - an archived sprint's full data, gzip-compressed and read-only
+
+Opening the dashboard reads only sprint.json and the active store's manifest, so it
+costs the same however many sprints have been archived. Comparing sprints reads only
+the index; an archive file is opened only when it is downloaded.
+"""
+import gzip
+import json
+import os
+import stat
+import threading
+import time
+from datetime import date
+
+from storage import GLOBAL_DEFAULTS, write_json
+
+SPRINT_FILE = 'sprint.json'
+ARCHIVE_DIR = 'archive'
+ARCHIVE_INDEX_FILE = 'index.json'
+
+
+class Sprint:
+    """One run through the plan: a numbered, named sprint starting on a given date."""
+
+    def __init__(self, number, name, start_date, total_days):
+        self.number = number
+        self.name = name
+        self.start_date = start_date
+        self.total_days = total_days
+
+    @property
+    def sprint_id(self):
+        return f"sprint_{self.number}"
+
+    @property
+    def end_date(self):
+        return date.fromordinal(self.start_date.toordinal() + self.total_days - 1)
+
+    def to_dict(self):
+        return {
+            'number': self.number,
+            'name': self.name,
+            'start_date': self.start_date.isoformat(),
+            'total_days': self.total_days
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['number'], data['name'], date.fromisoformat(data['start_date']), data['total_days'])
+
+
+def load_active_sprint(data_dir, default):
+    """Returns the active sprint, recording default as active if none has been yet.
+
+    Data written before sprints existed belongs to that default sprint. If sprint.json
+    was lost after sprints were archived, the default is numbered after the newest
+    archived sprint, so archiving it does not overwrite an earlier archive.
+    """
+    path = os.path.join(data_dir, SPRINT_FILE)
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            return Sprint.from_dict(json.load(f))
+    archived_numbers = [summary['sprint']['number'] for summary in load_archive_index(data_dir).values()]
+    if archived_numbers and default.number <= max(archived_numbers):
+        number = max(archived_numbers) + 1
+        default = Sprint(number, f"Sprint {number}", default.start_date, default.total_days)
+    save_active_sprint(data_dir, default)
+    return default
+
+
+def save_active_sprint(data_dir, sprint):
+    os.makedirs(data_dir, exist_ok=True)
+    write_json(os.path.join(data_dir, SPRINT_FILE), sprint.to_dict())
+
+
+def summarize_sprint(store, sprint):
+    """Headline stats for a sprint, computed from the store's manifest summaries only."""
+    completed_by_pillar, total_by_pillar = {}, {}
+    for summary in store.week_summaries():
+        for task_type, total in summary['total'].items():
+            total_by_pillar[task_type] = total_by_pillar.get(task_type, 0) + total
+            completed_by_pillar[task_type] = completed_by_pillar.get(task_type, 0) + summary['completed'].get(task_type, 0)
+    day_stats = store.day_stats()
+    completed_tasks = sum(completed_by_pillar.values())
+    total_tasks = sum(total_by_pillar.values())
+    active_days = (day_stats['completed'] > 0) | (day_stats['focus_minutes'] > 0) | (day_stats['jobs_applied'] > 0)
+    return {
+        'sprint': sprint.to_dict(),
+        'completed_tasks': completed_tasks,
+        'total_tasks': total_tasks,
+        'completion_pct': round(completed_tasks * 100 / total_tasks, 1) if total_tasks else 0.0,
+        'completed_by_pillar': completed_by_pillar,
+        'total_by_pillar': total_by_pillar,
+        'jobs_applied': int(day_stats['jobs_applied'].sum()),
+        'focus_hours': round(float(day_stats['focus_minutes'].sum()) / 60, 1),
+        'active_days': int(active_days.sum()),
+        **{key: store.manifest[key] for key in GLOBAL_DEFAULTS}
+    }
+
+
+def load_archive_index(data_dir):
+    """Summaries of every archived sprint, keyed by sprint id, oldest first."""
+    path = os.path.join(data_dir, ARCHIVE_DIR, ARCHIVE_INDEX_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r') as f:
+        index = json.load(f)
+    return dict(sorted(index.items(), key=lambda item: item[1]['sprint']['number']))
+
+
+def archive_path(data_dir, sprint_id):
+    """Path of an archived sprint's compressed data file."""
+    return os.path.join(data_dir, ARCHIVE_DIR, f"{sprint_id}.json.gz")
+
+
+def read_archive(data_dir, sprint_id):
+    """An archived sprint's compressed data file, as bytes for download."""
+    with open(archive_path(data_dir, sprint_id), 'rb') as f:
+        return f.read()
+
+
+def archive_sprint(store, sprint):
+    """Moves the active sprint out of the hot store into the compressed archive.
+
+    The full data and a precomputed summary are written first; only then is the
+    hot store cleared, ready for the next sprint. Returns the summary.
+    """
+    archive_dir = os.path.join(store.data_dir, ARCHIVE_DIR)
+    os.makedirs(archive_dir, exist_ok=True)
+    summary = dict(summarize_sprint(store, sprint), archived_at=time.time())
+    data = {
+        'sprint': sprint.to_dict(),
+        'summary': summary,
+        'manifest': store.manifest,
+        'weeks': {str(w): store.read_week(w) for w in range(1, store.total_weeks + 1)},
+        'history': {
+            key: {'timestamps': series.timestamps.tolist(), 'values': series.values.tolist()}
+            for key, series in store.history.items()
+        }
+    }
+    path = archive_path(store.data_dir, sprint.sprint_id)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with gzip.open(tmp_path, 'wt') as f:
+        json.dump(data, f)
+    os.chmod(tmp_path, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+    os.replace(tmp_path, path)
+
+    index = load_archive_index(store.data_dir)
+    index[sprint.sprint_id] = summary
+    write_json(os.path.join(archive_dir, ARCHIVE_INDEX_FILE), index)
+    store.reset()
+    return summary
@@ -0,0 +1,493 @@
+"""Week-partitioned storage for sprint data.
+
+Everything lives under one data directory:
+
+    manifest.json  - global counters (TryHackMe totals), a data version and a small
+                     summary per week (including per-day stats for the calendar heatmap)
+    week_<n>.json  - tasks, notes, timer data and job counts for the days of week n
+    <counter>.bin  - append-only timestamped history of each global counter
+    trash/<ns>/    - data set aside by an undoable reset, purged after a grace period
+
+Shards are loaded lazily the first time one of their days is viewed and kept in a
+small LRU cache, so a day view only ever touches its own week. Saving a day rewrites
+that week's shard and the manifest, never the whole dataset.
+
+Several sessions may share one data directory. Writes hold the directory's lock
+and start from the latest saved data: the manifest is re-read and any cached shard
+another session has saved since (its revision in the manifest moved on) is reloaded
+before the edit is applied, so sessions never overwrite each other's changes.
+"""
+import json
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Not on Windows: sessions of one server still share the thread lock below
+    fcntl = None
+
+import numpy as np
+
+from history import MetricSeries
+
+DAYS_PER_SHARD = 7
+SHARD_CACHE_SIZE = 4
+MANIFEST_FILE = 'manifest.json'
+SINGLE_DATA_FILE = 'sprint_data.json' # Used by SingleFileStore only
+TRASH_DIR = 'trash'
+LOCK_FILE = 'write.lock'
+LEGACY_IMPORTED_SUFFIX = '.imported' # Legacy file is renamed with this once imported
+
+# Per-day sections stored in each shard, keyed by day string ("1", "2", ...)
+DAY_SECTIONS = ('tasks', 'notes', 'timer_data', 'jobs_applied_daily')
+
+# Global counters stored in the manifest
+GLOBAL_DEFAULTS = {
+    'tryhackme_rooms_completed': 0,
+    'tryhackme_points_gained': 0
+}
+
+
+def week_for_day(day_num):
+    """Returns the 1-based week (shard) number that holds the given day."""
+    return (day_num - 1) // DAYS_PER_SHARD + 1
+
+
+def days_in_week(week_num, total_days):
+    """Returns the day numbers stored in a week's shard."""
+    first_day = (week_num - 1) * DAYS_PER_SHARD + 1
+    return range(first_day, min(first_day + DAYS_PER_SHARD, total_days + 1))
+
+
+def write_json(path, data):
+    """Writes JSON atomically so a crash mid-write never leaves a half-written file."""
+    # Unique per writer, so concurrent sessions never rename each other's temp file
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=4)
+    os.replace(tmp_path, path)
+
+
+_dir_locks = {}  # Absolute data directory -> lock shared by every store in this process
+_dir_locks_guard = threading.Lock()
+
+
+@contextmanager
+def data_dir_lock(data_dir):
+    """Serializes writers of one data directory, across threads and (where flock exists) processes."""
+    with _dir_locks_guard:
+        lock = _dir_locks.setdefault(os.path.abspath(data_dir), threading.Lock())
+    with lock:
+        if fcntl is None:
+            yield
+            return
+        with open(os.path.join(data_dir, LOCK_FILE), 'a') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def set_day_value(shard, day_num, path, value):
+    """Sets one field of a day's record in a shard; path is the section then any keys inside it."""
+    container, key = shard[path[0]], str(day_num)
+    for part in path[1:]:
+        container, key = container[key], part
+    container[key] = value
+
+
+def default_day(day_info):
+    """Builds the initial per-day records for one day of the task template."""
+    return {
+        'tasks': [
+            {'desc': task['desc'], 'type': task['type'], 'completed': False}
+            for task in day_info['tasks']
+        ],
+        'notes': "",
+        'timer_data': {'start_time': None, 'elapsed_time': 0},
+        'jobs_applied_daily': 0
+    }
+
+
+def summarize_week(shard):
+    """Computes the manifest summary (per-pillar counts, jobs, focus time) for a shard.
+
+    'days' maps each day string to [completed, total, focus_seconds, jobs_applied].
+    """
+    summary = {'completed': {}, 'total': {}, 'jobs_applied': 0, 'focus_seconds': 0, 'days': {}}
+    for day_str, day_tasks in shard['tasks'].items():
+        day_completed = 0
+        for task in day_tasks:
+            summary['total'][task['type']] = summary['total'].get(task['type'], 0) + 1
+            if task['completed']:
+                summary['completed'][task['type']] = summary['completed'].get(task['type'], 0) + 1
+                day_completed += 1
+        summary['days'][day_str] = [
+            day_completed,
+            len(day_tasks),
+            shard['timer_data'].get(day_str, {}).get('elapsed_time', 0),
+            shard['jobs_applied_daily'].get(day_str, 0)
+        ]
+    summary['jobs_applied'] = sum(shard['jobs_applied_daily'].values())
+    summary['focus_seconds'] = sum(t['elapsed_time'] for t in shard['timer_data'].values())
+    return summary
+
+
+class SprintStore:
+    """Lazily loads week shards on demand and persists only the shard that changed."""
+
+    def __init__(self, data_dir, template, total_days, cache_size=SHARD_CACHE_SIZE, legacy_file=None):
+        self.data_dir = data_dir
+        self.template = template
+        self.total_days = total_days
+        self.cache_size = cache_size
+        self.shards = OrderedDict()  # week number -> shard dict, most recently used last
+        self.shard_revisions = {}  # week number -> manifest revision of the cached shard when it was read
+        self.template_summaries = {}  # week number -> summary of a never-saved week
+        self.errors = []  # Load problems for the UI to surface
+        self._history = None  # Counter name -> MetricSeries, loaded on first use
+        os.makedirs(self.data_dir, exist_ok=True)
+        self.manifest = self._load_manifest()
+        if legacy_file and not os.path.exists(self._manifest_path()) and os.path.exists(legacy_file):
+            with data_dir_lock(self.data_dir):
+                # Another session may have imported it while this one waited
+                if not os.path.exists(self._manifest_path()) and os.path.exists(legacy_file):
+                    self._import_legacy(legacy_file)
+                else:
+                    self._reload_manifest()
+
+    # --- Paths ---
+    def _manifest_path(self):
+        return os.path.join(self.data_dir, MANIFEST_FILE)
+
+    def _shard_path(self, week_num):
+        return os.path.join(self.data_dir, f"week_{week_num}.json")
+
+    def _history_path(self, key):
+        return os.path.join(self.data_dir, f"{key}.bin")
+
+    @property
+    def total_weeks(self):
+        return week_for_day(self.total_days)
+
+    # --- Loading ---
+    def _read_file(self, path):
+        """Reads a JSON object from disk, discarding the file if it is corrupted."""
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r') as f:
+                loaded = json.load(f)
+            if isinstance(loaded, dict):
+                return loaded
+            self.errors.append(f"{os.path.basename(path)} is malformed. Starting it fresh.")
+        except json.JSONDecodeError:
+            self.errors.append(f"Error loading {os.path.basename(path)}. It might be corrupted. Starting it fresh.")
+        except Exception as e:
+            self.errors.append(f"An unexpected error occurred while loading {os.path.basename(path)}: {e}. Starting it fresh.")
+        os.remove(path)
+        return None
+
+    def _load_manifest(self):
+        manifest = dict(GLOBAL_DEFAULTS)
+        manifest['version'] = 0
+        manifest['weeks'] = {}
+        manifest['shard_revisions'] = {}  # week string -> version at which its shard was last written
+        loaded = self._read_file(self._manifest_path())
+        if loaded:
+            manifest.update(loaded)
+            for key in ('weeks', 'shard_revisions'):
+                if not isinstance(manifest.get(key), dict):
+                    manifest[key] = {}
+        return manifest
+
+    def _reload_manifest(self):
+        """Replaces the manifest with the one on disk, keeping the data version moving forward."""
+        version = self.manifest['version']
+        self.manifest = self._load_manifest()
+        self.manifest['version'] = max(self.manifest['version'], version)
+
+    def _new_shard(self, week_num, loaded=None):
+        """Builds a shard for a week, keeping loaded data and seeding any missing days."""
+        shard = {section: {} for section in DAY_SECTIONS}
+        if loaded:
+            for section in DAY_SECTIONS:
+                if isinstance(loaded.get(section), dict):
+                    shard[section] = loaded[section]
+        for day in days_in_week(week_num, self.total_days):
+            day_str = str(day)
+            for section, value in default_day(self.template[day]).items():
+                shard[section].setdefault(day_str, value)
+        return shard
+
+    def shard(self, week_num):
+        """Returns a week's shard, loading it from disk on first access."""
+        if week_num in self.shards:
+            self.shards.move_to_end(week_num)
+            return self.shards[week_num]
+        # Taken before the read: if the shard is saved in between, it only looks stale
+        self.shard_revisions[week_num] = self.manifest['shard_revisions'].get(str(week_num))
+        shard = self._new_shard(week_num, self._read_file(self._shard_path(week_num)))
+        self.shards[week_num] = shard
+        while len(self.shards) > self.cache_size:
+            evicted, _ = self.shards.popitem(last=False)
+            self.shard_revisions.pop(evicted, None)
+        return shard
+
+    def shard_for_day(self, day_num):
+        return self.shard(week_for_day(day_num))
+
+    def read_week(self, week_num):
+        """Returns a week's shard without adding it to the LRU cache (for full scans)."""
+        if week_num in self.shards:
+            return self.shards[week_num]
+        return self._new_shard(week_num, self._read_file(self._shard_path(week_num)))
+
+    def read_weeks(self, week_nums):
+        """Returns {week number: shard} for the given weeks, reading each shard once."""
+        return {week_num: self.read_week(week_num) for week_num in sorted(set(week_nums))}
+
+    def _import_legacy(self, legacy_file):
+        """Splits a single-file sprint_data.json into week shards plus a manifest.
+
+        The legacy file is then renamed aside, so a later loss of the manifest can
+        never re-import its stale data over the shards.
+        """
+        legacy = self._read_file(legacy_file)
+        if legacy is None:
+            return
+        for key in GLOBAL_DEFAULTS:
+            if isinstance(legacy.get(key), int):
+                self.manifest[key] = legacy[key]
+        for week_num in range(1, self.total_weeks + 1):
+            week_days = {str(d) for d in days_in_week(week_num, self.total_days)}
+            loaded = {
+                section: {k: v for k, v in legacy.get(section, {}).items() if k in week_days}
+                for section in DAY_SECTIONS
+                if isinstance(legacy.get(section), dict)
+            }
+            shard = self._new_shard(week_num, loaded)
+            write_json(self._shard_path(week_num), shard)
+            self.manifest['weeks'][str(week_num)] = summarize_week(shard)
+        self.save_manifest()
+        os.replace(legacy_file, legacy_file + LEGACY_IMPORTED_SUFFIX)
+
+    # --- Saving ---
+    def save_manifest(self):
+        # Every write bumps the data version, which keys the cached calendar views
+        self.manifest['version'] += 1
+        write_json(self._manifest_path(), self.manifest)
+
+    def _refresh(self, week_nums):
+        """Catches up with other sessions' saves before writing the given weeks (lock held)."""
+        self._reload_manifest()
+        for week_num in week_nums:
+            if week_num in self.shards and \
+                    self.shard_revisions.get(week_num) != self.manifest['shard_revisions'].get(str(week_num)):
+                del self.shards[week_num]
+
+    def _save_shards(self, shards):
+        """Persists modified shards ({week number: shard}) in one pass with a single manifest write.
+
+        Taking the shard objects, rather than week numbers, keeps a large batch safe even
+        if some of its weeks were evicted from the LRU cache while it ran.
+        """
+        revision = self.manifest['version'] + 1
+        for week_num, shard in shards.items():
+            write_json(self._shard_path(week_num), shard)
+            self.manifest['weeks'][str(week_num)] = summarize_week(shard)
+            self.manifest['shard_revisions'][str(week_num)] = revision
+            if week_num in self.shards:
+                self.shard_revisions[week_num] = revision
+        self.save_manifest()
+
+    def write_changes(self, day_values, counters=None):
+        """Sets day fields and global counters, saving them in one pass.
+
+        day_values holds (day number, path, value) for set_day_value; counters maps
+        counter names to new values. Only the weeks and counters named here are
+        written, on top of whatever other sessions have saved.
+        """
+        with data_dir_lock(self.data_dir):
+            self._refresh({week_for_day(day_num) for day_num, _, _ in day_values})
+            shards = {}
+            for day_num, path, value in day_values:
+                week_num = week_for_day(day_num)
+                if week_num not in shards:
+                    shards[week_num] = self.shard(week_num)
+                set_day_value(shards[week_num], day_num, path, value)
+            if counters:
+                self._history = None  # Another session may have appended samples since it was loaded
+            for key, value in (counters or {}).items():
+                self.set_counter(key, value, save=False)
+            self._save_shards(shards)
+
+    # --- Counter History ---
+    @property
+    def history(self):
+        """Time series for each global counter, loaded lazily. Reading never writes."""
+        if self._history is None:
+            self._history = {key: MetricSeries(self._history_path(key)) for key in GLOBAL_DEFAULTS}
+        return self._history
+
+    def set_counter(self, key, value, timestamp=None, save=True):
+        """Updates a global counter, recording the change in its history.
+
+        Pass save=False when the caller saves the manifest itself as part of a batch.
+        """
+        if save:
+            with data_dir_lock(self.data_dir):
+                self._refresh(())
+                self._history = None
+                self.set_counter(key, value, timestamp, save=False)
+                self.save_manifest()
+            return
+        timestamp = time.time() if timestamp is None else timestamp
+        series = self.history[key]
+        if len(series) == 0:
+            # The counter predates its history (or was never set): record where it started,
+            # just before the change, so the first change is counted as a gain from it
+            series.record(np.nextafter(timestamp, -np.inf), self.manifest[key])
+        self.manifest[key] = value
+        series.record(timestamp, value)
+
+    # --- Reset ---
+    def _data_files(self):
+        """Names of the files in data_dir that hold this store's data."""
+        return [
+            name for name in os.listdir(self.data_dir)
+            if name == MANIFEST_FILE or name.endswith('.bin') or (name.startswith('week_') and name.endswith('.json'))
+        ]
+
+    def _reload(self):
+        """Drops everything held in memory and reloads from disk, keeping the data version moving forward."""
+        self.shards.clear()
+        self.shard_revisions.clear()
+        self._history = None
+        self._reload_manifest()
+        self.save_manifest()
+
+    def reset(self):
+        """Deletes all data files, starting the sprint from scratch."""
+        with data_dir_lock(self.data_dir):
+            for name in self._data_files():
+                os.remove(os.path.join(self.data_dir, name))
+            self._reload()
+
+    def soft_reset(self):
+        """Starts the sprint from scratch, moving the old data into a trash folder instead
+        of deleting it. Returns that folder for restore_reset()."""
+        trash_dir = os.path.join(self.data_dir, TRASH_DIR, str(time.time_ns()))
+        os.makedirs(trash_dir)
+        with data_dir_lock(self.data_dir):
+            for name in self._data_files():
+                os.replace(os.path.join(self.data_dir, name), os.path.join(trash_dir, name))
+            self._reload()
+        return trash_dir
+
+    def restore_reset(self, trash_dir):
+        """Undoes a soft_reset(), replacing whatever was written since with the trashed data."""
+        with data_dir_lock(self.data_dir):
+            for name in self._data_files():
+                os.remove(os.path.join(self.data_dir, name))
+            for name in os.listdir(trash_dir):
+                os.replace(os.path.join(trash_dir, name), os.path.join(self.data_dir, name))
+            os.rmdir(trash_dir)
+            self._reload()
+
+    def purge_trash(self, grace_seconds):
+        """Permanently deletes soft-reset data older than the grace period."""
+        trash_root = os.path.join(self.data_dir, TRASH_DIR)
+        if not os.path.isdir(trash_root):
+            return
+        cutoff_ns = time.time_ns() - int(grace_seconds * 1e9)
+        for name in os.listdir(trash_root):
+            if name.isdigit() and int(name) < cutoff_ns:
+                shutil.rmtree(os.path.join(trash_root, name), ignore_errors=True)
+
+    # --- Aggregates ---
+    def week_summary(self, week_num):
+        """Returns a week's summary from the manifest, or from the template if never saved."""
+        summary = self.manifest['weeks'].get(str(week_num))
+        if summary is not None and 'days' not in summary:
+            # Written before per-day stats existed; rebuild it once from the shard
+            summary = summarize_week(self.shard(week_num))
+            self.manifest['weeks'][str(week_num)] = summary
+        if summary is None:
+            if week_num not in self.template_summaries:
+                self.template_summaries[week_num] = summarize_week(self._new_shard(week_num))
+            summary = self.template_summaries[week_num]
+        return summary
+
+    def week_summaries(self):
+        return [self.week_summary(w) for w in range(1, self.total_weeks + 1)]
+
+    def day_stats(self):
+        """Returns per-day arrays (index 0 is day 1) built from the manifest summaries.
+
+        Keys: 'completed', 'total', 'focus_minutes', 'jobs_applied'.
+        """
+        stats = np.zeros((self.total_days, 4), dtype=np.float64)
+        for summary in self.week_summaries():
+            for day_str, day_values in summary['days'].items():
+                day_num = int(day_str)
+                if 1 <= day_num <= self.total_days:
+                    stats[day_num - 1] = day_values
+        return {
+            'completed': stats[:, 0].astype(np.int64),
+            'total': stats[:, 1].astype(np.int64),
+            'focus_minutes': stats[:, 2] / 60,
+            'jobs_applied': stats[:, 3].astype(np.int64)
+        }
+
+
+class SingleFileStore(SprintStore):
+    """The original layout: the whole sprint in one JSON file, loaded up front and
+    rewritten on every save. Kept as a baseline for load-test comparisons."""
+
+    def __init__(self, data_dir, template, total_days, legacy_file=None):
+        # All weeks stay in memory, so the LRU never evicts; legacy import does not apply
+        super().__init__(data_dir, template, total_days, cache_size=week_for_day(total_days))
+
+    def _load_manifest(self):
+        manifest = super()._load_manifest()
+        stored_shards = manifest.pop('shards', None) or {}
+        self.shards.clear()
+        for week_num in range(1, self.total_weeks + 1):
+            self.shards[week_num] = self._new_shard(week_num, stored_shards.get(str(week_num)))
+        return manifest
+
+    def _data_files(self):
+        return [name for name in os.listdir(self.data_dir) if name == SINGLE_DATA_FILE or name.endswith('.bin')]
+
+    def _manifest_path(self):
+        return os.path.join(self.data_dir, SINGLE_DATA_FILE)
+
+    def shard(self, week_num):
+        return self.shards[week_num]
+
+    def _refresh(self, week_nums):
+        # The one file holds every week, so catching up means reloading all of it
+        self._reload_manifest()
+
+    def _save_shards(self, shards):
+        for week_num, shard in shards.items():
+            self.manifest['weeks'][str(week_num)] = summarize_week(shard)
+        self.save_manifest()
+
+    def save_manifest(self):
+        self.manifest['version'] += 1
+        shards = {str(week_num): shard for week_num, shard in self.shards.items()}
+        write_json(self._manifest_path(), dict(self.manifest, shards=shards))
+
+
+# Storage mode name -> store class
+STORAGE_MODES = {
+    'sharded': SprintStore,
+    'single': SingleFileStore
+}
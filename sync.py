@@ -0,0 +1,411 @@
+"""Pluggable adapters that pull progress from external sources.
+
+Providers are configured in SYNC_CONFIG_FILE, for example:
+
+    {
+        "rate_limit_per_second": 2,
+        "providers": [
+            {"kind": "http", "name": "TryHackMe", "url": "https://example.com/api/me",
+             "mapping": {"tryhackme_points_gained": "data.points",
+                         "tryhackme_rooms_completed": "data.completedRooms"}},
+            {"kind": "folder", "name": "Exports", "path": "sync_inbox"}
+        ]
+    }
+
+Every provider returns an *update* dict with any of these keys:
+
+    counters            {counter name: value}, e.g. tryhackme_points_gained
+    jobs_applied_daily  {day string: jobs applied that day}
+    completed_tasks     [{"match": text, "day": optional day number}], marks matching tasks done
+
+All providers are fetched concurrently under asyncio, sharing one pooled HTTP session,
+a per-host rate limiter and an on-disk response cache used for conditional requests.
+update_command() turns the result into an undoable edit applied through the store's save path.
+Providers always report the source's current state (a 304 reuses the cached body), and
+update_command() drops values the store already has, so a sync that was undone is
+re-applied by the next one.
+"""
+import asyncio
+import csv
+import hashlib
+import json
+import os
+import threading
+import time
+from urllib.parse import urlparse
+
+import aiohttp
+
+from commands import EditCommand, counter_change, day_change
+from storage import GLOBAL_DEFAULTS, days_in_week, week_for_day, write_json
+
+SYNC_CONFIG_FILE = 'sync_sources.json'
+SYNC_CACHE_DIR = 'sync_cache'
+DEFAULT_RATE_LIMIT_PER_SECOND = 2
+MAX_CONNECTIONS = 10
+REQUEST_TIMEOUT_SECONDS = 15
+
+# Provider kind (as written in the config) -> provider class
+PROVIDER_KINDS = {}
+
+
+def register_provider(kind):
+    """Class decorator that makes a provider available under a config 'kind'."""
+    def decorator(cls):
+        PROVIDER_KINDS[kind] = cls
+        return cls
+    return decorator
+
+
+class SyncError(Exception):
+    """Raised when a provider is misconfigured or returns unusable data."""
+
+
+# --- Shared Fetch Machinery ---
+class ResponseCache:
+    """On-disk cache of HTTP responses, keyed by URL, holding validators for conditional requests."""
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, hashlib.sha1(key.encode()).hexdigest() + '.json')
+
+    def get(self, key):
+        try:
+            with open(self._path(key), 'r') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def put(self, key, entry):
+        write_json(self._path(key), entry)
+
+
+class RateLimiter:
+    """Spaces out requests to each host so no host sees more than `rate` requests per second."""
+
+    def __init__(self, rate):
+        self.interval = 1 / rate if rate > 0 else 0
+        self.next_slot = {}  # host -> loop time of its next free slot
+        self.lock = asyncio.Lock()
+
+    async def wait(self, host):
+        async with self.lock:
+            now = asyncio.get_running_loop().time()
+            slot = max(now, self.next_slot.get(host, now))
+            self.next_slot[host] = slot + self.interval
+        await asyncio.sleep(slot - now)
+
+
+class FetchContext:
+    """Resources shared by all providers during one sync run."""
+
+    def __init__(self, session, cache, rate_limiter, total_days=None):
+        self.session = session
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        self.total_days = total_days  # Days in the sprint, for validating day numbers; None skips the upper bound
+        self.pending_cache = {}  # cache key -> entry to store once the update has been applied
+
+    async def get_json(self, url, headers=None):
+        """GETs JSON, revalidating any cached copy with If-None-Match/If-Modified-Since.
+
+        Returns (body, from_cache).
+        """
+        cached = self.cache.get(url)
+        request_headers = dict(headers or {})
+        if cached:
+            if cached.get('etag'):
+                request_headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                request_headers['If-Modified-Since'] = cached['last_modified']
+        await self.rate_limiter.wait(urlparse(url).netloc)
+        async with self.session.get(url, headers=request_headers) as response:
+            if response.status == 304 and cached:
+                return cached['body'], True
+            response.raise_for_status()
+            body = await response.json(content_type=None)
+            self.cache.put(url, {
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'fetched_at': time.time(),
+                'body': body
+            })
+            return body, False
+
+
+# --- Providers ---
+class ProgressProvider:
+    """Base class for progress sources. Subclasses implement fetch()."""
+
+    def __init__(self, name):
+        self.name = name
+
+    async def fetch(self, ctx):
+        """Returns an update dict, or None if there is nothing to report."""
+        raise NotImplementedError
+
+
+def _lookup(body, dotted_path):
+    """Follows a dotted path like 'data.points' through nested dicts/lists."""
+    value = body
+    for part in dotted_path.split('.'):
+        if isinstance(value, list):
+            value = value[int(part)]
+        else:
+            value = value[part]
+    return value
+
+
+def _whole_number(value):
+    """An exported count as an int; accepts ints and digit strings, nothing negative."""
+    if isinstance(value, str):
+        value = int(value.strip())
+    if isinstance(value, bool) or not isinstance(value, int) or value < 0:
+        raise ValueError(f"{value!r} is not a whole number")
+    return value
+
+
+def _day_number(value, total_days):
+    day_num = _whole_number(value)
+    if day_num < 1 or (total_days is not None and day_num > total_days):
+        raise ValueError(f"day {day_num} is outside the sprint")
+    return day_num
+
+
+@register_provider('http')
+class HttpJsonProvider(ProgressProvider):
+    """Reads counters from a JSON HTTP API using a field -> dotted path mapping."""
+
+    def __init__(self, name, url, mapping, headers=None):
+        super().__init__(name)
+        unknown = set(mapping) - set(GLOBAL_DEFAULTS)
+        if unknown:
+            raise SyncError(f"{name}: unknown counters in mapping: {', '.join(sorted(unknown))}")
+        self.url = url
+        self.mapping = mapping
+        self.headers = headers or {}
+
+    async def fetch(self, ctx):
+        body, _ = await ctx.get_json(self.url, self.headers)
+        try:
+            return {'counters': {field: int(_lookup(body, path)) for field, path in self.mapping.items()}}
+        except (KeyError, IndexError, TypeError, ValueError) as e:
+            raise SyncError(f"{self.name}: response did not match mapping ({e})")
+
+
+@register_provider('folder')
+class FolderProvider(ProgressProvider):
+    """Picks up exported .json or .csv files dropped into a watched folder.
+
+    JSON files contain an update dict directly. CSV files have the columns
+    field, day, value where field is a counter name, 'jobs_applied_daily'
+    or 'completed_task' (value is then the task text to match). Both are
+    validated the same way: counts must be whole numbers and days must lie
+    within the sprint, otherwise the file is reported as this provider's error.
+    Only files that are new or modified since the last applied sync are read.
+    """
+
+    def __init__(self, name, path):
+        super().__init__(name)
+        self.path = path
+
+    async def fetch(self, ctx):
+        if not os.path.isdir(self.path):
+            return None
+        seen_key = f"folder:{os.path.abspath(self.path)}"
+        seen = (ctx.cache.get(seen_key) or {}).get('body', {})
+        update = {}
+        for file_name in sorted(os.listdir(self.path)):
+            file_path = os.path.join(self.path, file_name)
+            mtime = os.path.getmtime(file_path)
+            if not file_name.endswith(('.json', '.csv')) or seen.get(file_name) == mtime:
+                continue
+            # File parsing is blocking I/O, keep it off the event loop
+            file_update = await asyncio.to_thread(self._read_file, file_path, ctx.total_days)
+            merge_updates(update, file_update)
+            seen[file_name] = mtime
+        # Marked as seen only once the update is applied (see SyncJob.mark_applied)
+        ctx.pending_cache[seen_key] = {'fetched_at': time.time(), 'body': seen}
+        return update or None
+
+    @staticmethod
+    def _add_entry(update, field, day, value, total_days):
+        """Validates one exported value and adds it to update."""
+        if field in GLOBAL_DEFAULTS:
+            update.setdefault('counters', {})[field] = _whole_number(value)
+        elif field == 'jobs_applied_daily':
+            update.setdefault('jobs_applied_daily', {})[str(_day_number(day, total_days))] = _whole_number(value)
+        elif field == 'completed_task':
+            if not isinstance(value, str) or not value.strip():
+                raise ValueError("a completed task needs the task text to match")
+            day_num = None if day in (None, '') else _day_number(day, total_days)
+            update.setdefault('completed_tasks', []).append({'match': value.strip(), 'day': day_num})
+        else:
+            raise ValueError(f"unknown field '{field}'")
+
+    def _read_file(self, file_path, total_days=None):
+        update = {}
+        try:
+            if file_path.endswith('.json'):
+                with open(file_path, 'r') as f:
+                    exported = json.load(f)
+                if not isinstance(exported, dict):
+                    raise ValueError("not a JSON object")
+                unknown = set(exported) - {'counters', 'jobs_applied_daily', 'completed_tasks'}
+                if unknown:
+                    raise ValueError(f"unknown keys {', '.join(sorted(unknown))}")
+                counters = exported.get('counters', {})
+                jobs = exported.get('jobs_applied_daily', {})
+                tasks = exported.get('completed_tasks', [])
+                if not isinstance(counters, dict) or not isinstance(jobs, dict) or not isinstance(tasks, list):
+                    raise ValueError("counters and jobs_applied_daily must be objects, completed_tasks a list")
+                for field, value in counters.items():
+                    if field not in GLOBAL_DEFAULTS:
+                        raise ValueError(f"unknown counter '{field}'")
+                    self._add_entry(update, field, None, value, total_days)
+                for day, value in jobs.items():
+                    self._add_entry(update, 'jobs_applied_daily', day, value, total_days)
+                for entry in tasks:
+                    if not isinstance(entry, dict):
+                        raise ValueError("completed_tasks entries must be objects")
+                    self._add_entry(update, 'completed_task', entry.get('day'), entry.get('match'), total_days)
+                return update
+            with open(file_path, 'r', newline='') as f:
+                for row in csv.DictReader(f):
+                    self._add_entry(update, row['field'].strip(), (row.get('day') or '').strip(),
+                                    row['value'].strip(), total_days)
+            return update
+        except (OSError, KeyError, TypeError, ValueError) as e:
+            raise SyncError(f"{self.name}: could not read {os.path.basename(file_path)} ({e})")
+
+
+def load_providers(config_file=SYNC_CONFIG_FILE):
+    """Builds providers from the sync config file. Returns (providers, rate_limit)."""
+    if not os.path.exists(config_file):
+        return [], DEFAULT_RATE_LIMIT_PER_SECOND
+    with open(config_file, 'r') as f:
+        config = json.load(f)
+    providers = []
+    for spec in config.get('providers', []):
+        spec = dict(spec)
+        kind = spec.pop('kind', None)
+        if kind not in PROVIDER_KINDS:
+            raise SyncError(f"Unknown provider kind '{kind}' in {config_file}")
+        providers.append(PROVIDER_KINDS[kind](**spec))
+    return providers, config.get('rate_limit_per_second', DEFAULT_RATE_LIMIT_PER_SECOND)
+
+
+# --- Running a Sync ---
+def merge_updates(into, update):
+    """Merges one provider's update into another, later values winning."""
+    for key in ('counters', 'jobs_applied_daily'):
+        if update.get(key):
+            into.setdefault(key, {}).update(update[key])
+    if update.get('completed_tasks'):
+        into.setdefault('completed_tasks', []).extend(update['completed_tasks'])
+    return into
+
+
+async def fetch_all(providers, cache_dir=SYNC_CACHE_DIR, rate_limit=DEFAULT_RATE_LIMIT_PER_SECOND, total_days=None):
+    """Fetches every provider concurrently.
+
+    Returns (merged update, {provider name: error}, cache entries to store once the update is applied).
+    """
+    connector = aiohttp.TCPConnector(limit=MAX_CONNECTIONS)
+    timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT_SECONDS)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        ctx = FetchContext(session, ResponseCache(cache_dir), RateLimiter(rate_limit), total_days)
+        results = await asyncio.gather(*(p.fetch(ctx) for p in providers), return_exceptions=True)
+    merged, errors = {}, {}
+    for provider, result in zip(providers, results):
+        if isinstance(result, Exception):
+            errors[provider.name] = str(result) or type(result).__name__
+        elif result:
+            merge_updates(merged, result)
+    return merged, errors, ctx.pending_cache
+
+
+class SyncJob:
+    """Runs fetch_all() on a background thread so page renders never wait on the network."""
+
+    def __init__(self, providers, cache_dir=SYNC_CACHE_DIR, rate_limit=DEFAULT_RATE_LIMIT_PER_SECOND, total_days=None):
+        self.started_at = time.time()
+        self.cache_dir = cache_dir
+        self.update = None
+        self.errors = {}
+        self.pending_cache = {}
+        self._thread = threading.Thread(
+            target=self._run, args=(providers, cache_dir, rate_limit, total_days), daemon=True
+        )
+        self._thread.start()
+
+    def _run(self, providers, cache_dir, rate_limit, total_days):
+        try:
+            self.update, self.errors, self.pending_cache = asyncio.run(
+                fetch_all(providers, cache_dir, rate_limit, total_days)
+            )
+        except Exception as e:
+            self.update, self.errors = {}, {'sync': str(e)}
+
+    def done(self):
+        return not self._thread.is_alive()
+
+    def mark_applied(self):
+        """Records what this sync consumed (e.g. folder files seen). Call after applying its update."""
+        cache = ResponseCache(self.cache_dir)
+        for key, entry in self.pending_cache.items():
+            cache.put(key, entry)
+        self.pending_cache = {}
+
+
+def update_command(store, update):
+    """Turns a merged update into one undoable EditCommand.
+
+    Returns (command, change descriptions). Executing the command applies the update
+    through the store's save path, saving each touched week once.
+    """
+    changes, descriptions = [], []
+    for key, value in update.get('counters', {}).items():
+        if key in GLOBAL_DEFAULTS and value != store.manifest[key]:
+            changes.append(counter_change(key, store.manifest[key], value))
+            descriptions.append(f"{key.replace('_', ' ')} → {value}")
+
+    jobs_by_day = {
+        int(day_str): int(jobs) for day_str, jobs in update.get('jobs_applied_daily', {}).items()
+        if 1 <= int(day_str) <= store.total_days
+    }
+    task_entries = [
+        entry for entry in update.get('completed_tasks', [])
+        if not entry.get('day') or 1 <= entry['day'] <= store.total_days
+    ]
+    # Every week the update touches is read once, however many days or entries refer to it
+    week_nums = {week_for_day(day_num) for day_num in jobs_by_day}
+    for entry in task_entries:
+        week_nums.update([week_for_day(entry['day'])] if entry.get('day') else range(1, store.total_weeks + 1))
+    shards = store.read_weeks(week_nums)
+
+    for day_num, jobs in jobs_by_day.items():
+        current = shards[week_for_day(day_num)]['jobs_applied_daily'].get(str(day_num), 0)
+        if current != jobs:
+            changes.append(day_change(day_num, ('jobs_applied_daily',), current, jobs))
+            descriptions.append(f"Day {day_num} jobs applied → {jobs}")
+
+    marked = set()
+    for entry in task_entries:
+        match = entry['match'].lower()
+        day = entry.get('day')
+        weeks = [week_for_day(day)] if day else range(1, store.total_weeks + 1)
+        for week_num in weeks:
+            shard = shards[week_num]
+            for day_num in days_in_week(week_num, store.total_days):
+                if day and day_num != day:
+                    continue
+                for position, task in enumerate(shard['tasks'][str(day_num)]):
+                    if not task['completed'] and match in task['desc'].lower() and (day_num, position) not in marked:
+                        marked.add((day_num, position))
+                        changes.append(day_change(day_num, ('tasks', position, 'completed'), False, True))
+                        descriptions.append(f"Day {day_num}: {task['desc']} ✓")
+    return EditCommand("Sync progress", changes), descriptions
@@ -0,0 +1,54 @@
+"""Tests for the week-sharded store when several sessions share one data directory."""
+import pytest
+
+from commands import CommandLog, EditCommand, day_change
+from storage import STORAGE_MODES
+
+TEMPLATE = {day: {"tasks": [{"desc": f"Task {day}", "type": "Google Cert"}]} for day in range(1, 22)}
+
+
+def complete_task(store, day_num):
+    CommandLog().execute(store, EditCommand("Complete", [day_change(day_num, ('tasks', 0, 'completed'), False, True)]))
+
+
+@pytest.mark.parametrize('mode', sorted(STORAGE_MODES))
+def test_sessions_do_not_overwrite_each_other(tmp_path, mode):
+    store_a = STORAGE_MODES[mode](str(tmp_path), TEMPLATE, 21)
+    store_b = STORAGE_MODES[mode](str(tmp_path), TEMPLATE, 21)
+    # Both sessions have week 1 cached before either one saves
+    store_a.shard_for_day(1)
+    store_b.shard_for_day(2)
+
+    complete_task(store_b, 15)
+    complete_task(store_b, 2)
+    complete_task(store_a, 1)
+    store_a.set_counter('tryhackme_points_gained', 30)
+
+    reloaded = STORAGE_MODES[mode](str(tmp_path), TEMPLATE, 21)
+    assert reloaded.week_summary(3)['completed'] == {'Google Cert': 1}
+    assert reloaded.week_summary(1)['completed'] == {'Google Cert': 2}
+    assert reloaded.shard_for_day(1)['tasks']['1'][0]['completed']
+    assert reloaded.shard_for_day(2)['tasks']['2'][0]['completed']
+    assert reloaded.manifest['tryhackme_points_gained'] == 30
+
+
+def test_stale_cached_shard_is_reloaded_before_writing(tmp_path):
+    store_a = STORAGE_MODES['sharded'](str(tmp_path), TEMPLATE, 21)
+    store_b = STORAGE_MODES['sharded'](str(tmp_path), TEMPLATE, 21)
+    stale = store_a.shard_for_day(3)
+    complete_task(store_b, 3)
+
+    complete_task(store_a, 4)
+    assert store_a.shard_for_day(3) is not stale
+    assert store_a.shard_for_day(3)['tasks']['3'][0]['completed']
+
+
+def test_counter_history_is_anchored_only_when_it_changes(tmp_path):
+    store = STORAGE_MODES['sharded'](str(tmp_path), TEMPLATE, 21)
+    assert len(store.history['tryhackme_rooms_completed']) == 0
+    assert not list(tmp_path.glob('*.bin'))
+
+    store.set_counter('tryhackme_rooms_completed', 5, timestamp=1000.0)
+    series = store.history['tryhackme_rooms_completed']
+    assert series.values.tolist() == [0, 5]
+    assert series.gains([0.0, 2000.0]).tolist() == [5]
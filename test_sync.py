@@ -0,0 +1,222 @@
+"""Tests for the progress-sync providers, run against a local aiohttp mock server."""
+import asyncio
+import json
+import os
+import time
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from commands import Change, CommandLog
+from storage import SprintStore
+from sync import FolderProvider, HttpJsonProvider, RateLimiter, ResponseCache, fetch_all, update_command
+
+TEMPLATE = {
+    day: {"tasks": [
+        {"desc": f"Google Cert module {day}", "type": "Google Cert"},
+        {"desc": f"TryHackMe room {day}", "type": "TryHackMe"},
+    ]}
+    for day in range(1, 8)
+}
+
+
+class MockApi:
+    """A JSON endpoint with an ETag, counting the requests and 304s it served."""
+
+    def __init__(self, body):
+        self.body = body
+        self.requests = 0
+        self.not_modified = 0
+
+    def etag(self):
+        return f'"{hash(json.dumps(self.body, sort_keys=True))}"'
+
+    async def handle(self, request):
+        self.requests += 1
+        if request.headers.get('If-None-Match') == self.etag():
+            self.not_modified += 1
+            return web.Response(status=304)
+        return web.json_response(self.body, headers={'ETag': self.etag()})
+
+
+async def start_server(routes):
+    """Serves {path: handler} on localhost; returns the started TestServer."""
+    app = web.Application()
+    for path, handler in routes.items():
+        app.router.add_get(path, handler)
+    server = TestServer(app, host='127.0.0.1')
+    await server.start_server()
+    return server
+
+
+def make_store(tmp_path):
+    return SprintStore(str(tmp_path / 'data'), TEMPLATE, 7)
+
+
+def test_not_modified_response_reuses_cached_body(tmp_path):
+    api = MockApi({'data': {'points': 120, 'completedRooms': 4}})
+
+    async def scenario():
+        server = await start_server({'/me': api.handle})
+        try:
+            provider = HttpJsonProvider('THM', str(server.make_url('/me')), {
+                'tryhackme_points_gained': 'data.points',
+                'tryhackme_rooms_completed': 'data.completedRooms',
+            })
+            first = await fetch_all([provider], str(tmp_path / 'cache'), rate_limit=100)
+            second = await fetch_all([provider], str(tmp_path / 'cache'), rate_limit=100)
+            return first, second
+        finally:
+            await server.close()
+
+    (first_update, first_errors, _), (second_update, second_errors, _) = asyncio.run(scenario())
+    expected = {'counters': {'tryhackme_points_gained': 120, 'tryhackme_rooms_completed': 4}}
+    assert first_update == expected and not first_errors
+    assert api.not_modified == 1
+    assert second_update == expected and not second_errors
+
+
+def test_undone_sync_is_reapplied_after_304(tmp_path):
+    api = MockApi({'points': 50})
+    store = make_store(tmp_path)
+    log = CommandLog()
+
+    async def scenario():
+        server = await start_server({'/me': api.handle})
+        try:
+            provider = HttpJsonProvider('THM', str(server.make_url('/me')), {'tryhackme_points_gained': 'points'})
+            update, _, _ = await fetch_all([provider], str(tmp_path / 'cache'), rate_limit=100)
+            command, _ = update_command(store, update)
+            log.execute(store, command)
+            log.undo(store)
+            assert store.manifest['tryhackme_points_gained'] == 0
+            # The source has not changed, so this sync is answered with a 304
+            update, _, _ = await fetch_all([provider], str(tmp_path / 'cache'), rate_limit=100)
+            return update_command(store, update)
+        finally:
+            await server.close()
+
+    command, descriptions = asyncio.run(scenario())
+    assert api.not_modified == 1
+    assert command.changes == [Change('counter', 'tryhackme_points_gained', (), 0, 50)]
+    assert descriptions
+
+
+def test_mapping_error_is_reported_per_provider(tmp_path):
+    good_api = MockApi({'points': 10})
+    bad_api = MockApi({'unexpected': True})
+
+    async def scenario():
+        server = await start_server({'/good': good_api.handle, '/bad': bad_api.handle})
+        try:
+            providers = [
+                HttpJsonProvider('Good', str(server.make_url('/good')), {'tryhackme_points_gained': 'points'}),
+                HttpJsonProvider('Bad', str(server.make_url('/bad')), {'tryhackme_rooms_completed': 'data.rooms'}),
+            ]
+            return await fetch_all(providers, str(tmp_path / 'cache'), rate_limit=100)
+        finally:
+            await server.close()
+
+    update, errors, _ = asyncio.run(scenario())
+    assert update == {'counters': {'tryhackme_points_gained': 10}}
+    assert list(errors) == ['Bad']
+    assert 'did not match mapping' in errors['Bad']
+
+
+def test_rate_limiter_spaces_requests_per_host():
+    async def scenario():
+        limiter = RateLimiter(rate=20)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        await asyncio.gather(*(limiter.wait('a.example') for _ in range(4)))
+        same_host_elapsed = loop.time() - started
+        started = loop.time()
+        await asyncio.gather(limiter.wait('b.example'), limiter.wait('c.example'))
+        return same_host_elapsed, loop.time() - started
+
+    same_host_elapsed, other_hosts_elapsed = asyncio.run(scenario())
+    # Four requests at 20/s: the last one waits three intervals of 50 ms
+    assert same_host_elapsed >= 0.14
+    assert other_hosts_elapsed < 0.05
+
+
+def test_folder_provider_reads_only_new_or_changed_files(tmp_path):
+    inbox = tmp_path / 'inbox'
+    inbox.mkdir()
+    cache_dir = str(tmp_path / 'cache')
+    provider = FolderProvider('Exports', str(inbox))
+    (inbox / 'jobs.csv').write_text("field,day,value\njobs_applied_daily,2,3\n")
+    (inbox / 'notes.txt').write_text("ignored")
+
+    def sync(apply=True):
+        update, errors, pending = asyncio.run(fetch_all([provider], cache_dir, rate_limit=100))
+        assert not errors
+        if apply:
+            for key, entry in pending.items():
+                ResponseCache(cache_dir).put(key, entry)
+        return update
+
+    # Not applied yet, so the file is read again on the next sync
+    assert sync(apply=False) == {'jobs_applied_daily': {'2': 3}}
+    assert sync() == {'jobs_applied_daily': {'2': 3}}
+    assert sync() == {}
+
+    (inbox / 'thm.json').write_text(json.dumps({'counters': {'tryhackme_rooms_completed': 7}}))
+    assert sync() == {'counters': {'tryhackme_rooms_completed': 7}}
+
+    (inbox / 'jobs.csv').write_text("field,day,value\njobs_applied_daily,2,5\n")
+    future = time.time() + 10
+    os.utime(inbox / 'jobs.csv', (future, future))
+    assert sync() == {'jobs_applied_daily': {'2': 5}}
+
+
+def test_update_command_builds_changes_and_skips_current_values(tmp_path):
+    store = make_store(tmp_path)
+    store.set_counter('tryhackme_points_gained', 40)
+    command, descriptions = update_command(store, {
+        'counters': {'tryhackme_points_gained': 40, 'tryhackme_rooms_completed': 3},
+        'jobs_applied_daily': {'2': 4, '99': 1},
+        'completed_tasks': [{'match': 'tryhackme room', 'day': 3}, {'match': 'module 5'}],
+    })
+    assert command.changes == [
+        Change('counter', 'tryhackme_rooms_completed', (), 0, 3),
+        Change('day', 2, ('jobs_applied_daily',), 0, 4),
+        Change('day', 3, ('tasks', 1, 'completed'), False, True),
+        Change('day', 5, ('tasks', 0, 'completed'), False, True),
+    ]
+    assert len(descriptions) == 4
+
+    CommandLog().execute(store, command)
+    repeat, _ = update_command(store, {'jobs_applied_daily': {'2': 4}, 'completed_tasks': [{'match': 'module 5'}]})
+    assert repeat.changes == []
+
+
+def test_folder_provider_validates_json_exports(tmp_path):
+    inbox = tmp_path / 'inbox'
+    inbox.mkdir()
+    provider = FolderProvider('Exports', str(inbox))
+
+    def sync(export):
+        # Nothing is marked seen until applied, so the rewritten file is read every time
+        (inbox / 'export.json').write_text(json.dumps(export))
+        update, errors, _ = asyncio.run(fetch_all([provider], str(tmp_path / 'cache'), rate_limit=100, total_days=7))
+        return update, errors.get('Exports')
+
+    assert sync({'counters': {'tryhackme_points_gained': "12"}, 'jobs_applied_daily': {'3': 2},
+                 'completed_tasks': [{'match': 'module 5', 'day': "5"}]}) == ({
+        'counters': {'tryhackme_points_gained': 12},
+        'jobs_applied_daily': {'3': 2},
+        'completed_tasks': [{'match': 'module 5', 'day': 5}],
+    }, None)
+    for bad_export in (
+        {'counters': {'tryhackme_points_gained': "twelve"}},
+        {'counters': {'unknown_counter': 1}},
+        {'jobs_applied_daily': {'x': 1}},
+        {'jobs_applied_daily': {'3': 'abc'}},
+        {'jobs_applied_daily': {'30': 1}},
+        {'completed_tasks': [{'day': 3}]},
+        {'completed_tasks': [{'match': 'module', 'day': -3}]},
+        {'completed_tasks': {'match': 'module'}},
+    ):
+        update, error = sync(bad_export)
+        assert update == {} and 'could not read export.json' in error, bad_export